@@ -0,0 +1,191 @@
+# assets.py
+
+import sys
+import os.path
+import json
+import mmap
+import hashlib
+import concurrent.futures
+from typing import Iterator
+import pygame
+import config as cfg
+import entity as ent
+import resizer
+
+
+# ##############################################    IMAGE KEYS    ######################################################
+
+# An ImageKey identifies one fully processed image variant: (img_filename, flip, resize, w, h). Two specs that share a
+# filename but differ in flip/resize/size are DIFFERENT images once processed, so everything that caches or packs
+# processed pixels is keyed by the full tuple and not by the filename alone.
+ImageKey = tuple[str, bool, bool, int, int]
+
+# The background is not a sprite and has no spec. Native size, never flipped or resized. w/h of 0 mean "as is".
+BACKGROUND_KEY: ImageKey = (cfg.BGIMG, False, False, 0, 0)
+
+
+# Sprayed props are never flipped or resized, whatever their template says. See propspray.py.
+def prop_template_key(prop_t: ent.PropTemplate) -> ImageKey:
+    return prop_t['img_filename'], False, False, prop_t['w'], prop_t['h']
+
+
+# Every unique ImageKey referenced by the spec data in entity.py, in first-seen order.
+def spec_image_keys() -> list[ImageKey]:
+    keys: dict[ImageKey, None] = {}  # A dict as an insertion-ordered set.
+    for spec in [*ent.player_records, *ent.npc_records, *ent.weapon_records]:
+        keys[spec.img_key] = None
+    for prop_t in ent.prop_templates:
+        keys[prop_template_key(prop_t)] = None
+    return list(keys)
+
+
+# ##############################################    HEADLESS DECODE    #################################################
+
+# Decodes an image and applies the resize option, WITHOUT needing a display (no convert/convert_alpha here.) Returns an
+# unconverted Surface at its final size. Safe to call from worker threads: the file read, the PNG/JPEG decode and the
+# OpenCV resize do not touch the display, and both SDL_image and cv2 release the GIL while they work.
+def decode_surface(key: ImageKey) -> pygame.Surface:
+    filename, flip, resize, width, height = key
+    image_path = os.path.join(cfg.ASSET_PATH, filename)
+    if resize and width and height:
+        with open(image_path, 'rb') as fh:
+            rgba_pixels = resizer.alphonic_resize(img_data=fh.read(), width=width, height=height)
+        return pygame.image.frombuffer(rgba_pixels, (width, height), 'RGBA')  # Keeps a reference to rgba_pixels.
+    return pygame.image.load(image_path)
+
+
+# As decode_surface() but with the flip option applied too. Returns the LEFT-facing variant as raw RGBA bytes plus its
+# final size. The RIGHT variant is just this mirrored.
+def decode_rgba(key: ImageKey) -> tuple[bytes, int, int]:
+    surface = decode_surface(key)
+    if key[1]:  # flip
+        surface = pygame.transform.flip(surface, True, False)
+    return pygame.image.tobytes(surface, 'RGBA'), surface.get_width(), surface.get_height()
+
+
+# Decodes (and resizes) many images concurrently on a thread pool. Yields (key, unconverted Surface) in the order of
+# keys, as each result becomes available, so the caller can convert on the main thread while workers keep decoding.
+def decode_surfaces_parallel(keys: list[ImageKey], workers: int | None = None) -> Iterator[tuple[ImageKey, pygame.Surface]]:
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from zip(keys, pool.map(decode_surface, keys))
+
+
+# ###############################################    ASSET BUNDLE    ###################################################
+
+# The bundle is a single binary file of ready-to-blit RGBA pixels at their final size, for both the left and right
+# variants of every spec-referenced image (plus the background, left only.) Layout:
+#     8 bytes    BUNDLE_MAGIC
+#     4 bytes    little-endian length of the JSON index
+#     N bytes    JSON index: {'fingerprint': str, 'entries': [{'key', 'w', 'h', 'opaque', 'l', 'r'}, ...]}
+#     ...        pixel blobs, each starting on a BUNDLE_ALIGN boundary. 'l' and 'r' are absolute file offsets.
+# At startup the file is memory-mapped and Surfaces are created straight from slices of the map with frombuffer(), so
+# nothing is decoded, resized or flipped. The fingerprint covers the spec keys and the size/mtime of each source file,
+# so editing a spec or touching an asset makes open_bundle() rebuild the bundle automatically.
+BUNDLE_MAGIC: bytes = b'PYABNDL1'
+BUNDLE_ALIGN: int = 64
+
+
+def bundle_fingerprint(keys: list[ImageKey]) -> str:
+    digest = hashlib.sha1(BUNDLE_MAGIC)
+    digest.update(repr(keys).encode())
+    for filename in sorted({key[0] for key in keys}):
+        stat = os.stat(os.path.join(cfg.ASSET_PATH, filename))
+        digest.update(f'{filename}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return digest.hexdigest()
+
+
+def build_bundle(path: str, keys: list[ImageKey]) -> None:
+    entries = []
+    blobs: list[bytes] = []
+    for key in keys:
+        pixels_l, width, height = decode_rgba(key)
+        opaque = key == BACKGROUND_KEY
+        entry = {'key': list(key), 'w': width, 'h': height, 'opaque': opaque, 'l': len(blobs), 'r': None}
+        blobs.append(pixels_l)
+        if not opaque:
+            surface_l = pygame.image.frombuffer(pixels_l, (width, height), 'RGBA')
+            entry['r'] = len(blobs)
+            blobs.append(pygame.image.tobytes(pygame.transform.flip(surface_l, True, False), 'RGBA'))
+        entries.append(entry)
+
+    # Offsets depend on the index length and the index contains the offsets, so size the index with placeholder
+    # offsets first. Real offsets are never longer than the 20-digit placeholder, and the JSON is padded to the size.
+    placeholder = 10 ** 19
+    probe = json.dumps({'fingerprint': bundle_fingerprint(keys),
+                        'entries': [{**e, 'l': placeholder, 'r': placeholder} for e in entries]})
+    index_size = len(probe.encode())
+    offset = -(-(len(BUNDLE_MAGIC) + 4 + index_size) // BUNDLE_ALIGN) * BUNDLE_ALIGN
+    blob_offsets = []
+    for blob in blobs:
+        blob_offsets.append(offset)
+        offset = -(-(offset + len(blob)) // BUNDLE_ALIGN) * BUNDLE_ALIGN
+    for entry in entries:
+        entry['l'] = blob_offsets[entry['l']]
+        entry['r'] = None if entry['r'] is None else blob_offsets[entry['r']]
+    index = json.dumps({'fingerprint': bundle_fingerprint(keys), 'entries': entries}).encode().ljust(index_size)
+
+    tmp_path = path + '.tmp'  # Write aside and rename, so a crashed build never leaves a half-written bundle behind.
+    with open(tmp_path, 'wb') as fh:
+        fh.write(BUNDLE_MAGIC)
+        fh.write(index_size.to_bytes(4, 'little'))
+        fh.write(index)
+        for blob, blob_offset in zip(blobs, blob_offsets):
+            fh.seek(blob_offset)
+            fh.write(blob)
+    os.replace(tmp_path, path)
+
+
+class AssetBundle:
+    def __init__(self, path: str):
+        with open(path, 'rb') as fh:
+            self.mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+            raise ValueError(f"FATAL: '{path}' is not an asset bundle.")
+        index_start = len(BUNDLE_MAGIC) + 4
+        index_size = int.from_bytes(self.mm[len(BUNDLE_MAGIC):index_start], 'little')
+        index = json.loads(self.mm[index_start:index_start + index_size])
+        self.fingerprint: str = index['fingerprint']
+        self.entries: dict[ImageKey, dict] = {tuple(e['key']): e for e in index['entries']}
+
+    def _surface(self, offset: int, width: int, height: int, opaque: bool) -> pygame.Surface:
+        view = memoryview(self.mm)[offset:offset + width * height * 4]  # Zero-copy slice of the map.
+        surface = pygame.image.frombuffer(view, (width, height), 'RGBA')
+        return surface.convert() if opaque else surface.convert_alpha()  # The one copy, into display format.
+
+    # Returns (surface_l, surface_r) ready to blit, or None if the key is not bundled. surface_r is None for the
+    # background. Requires the display to be initialized (convert/convert_alpha.)
+    def surfaces(self, key: ImageKey) -> tuple[pygame.Surface, pygame.Surface | None] | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        width, height, opaque = entry['w'], entry['h'], entry['opaque']
+        surface_l = self._surface(entry['l'], width, height, opaque)
+        surface_r = None if entry['r'] is None else self._surface(entry['r'], width, height, opaque)
+        return surface_l, surface_r
+
+
+# Memory-maps the bundle at path, (re)building it first if it is missing or its fingerprint no longer matches.
+def open_bundle(path: str, keys: list[ImageKey]) -> AssetBundle:
+    if os.path.exists(path):
+        bundle = AssetBundle(path)
+        if bundle.fingerprint == bundle_fingerprint(keys):
+            return bundle
+        bundle.mm.close()
+        print(f"Asset bundle '{path}' is stale. Rebuilding.")
+    build_bundle(path, keys)
+    return AssetBundle(path)
+
+
+def bundle_keys() -> list[ImageKey]:
+    return [*spec_image_keys(), BACKGROUND_KEY]
+
+
+# The build step. Running this module directly (from the game directory) preprocesses every spec-referenced asset.
+if __name__ == '__main__':
+    build_bundle(cfg.ASSET_BUNDLE_PATH, bundle_keys())
+    print(f"Asset bundle written to '{cfg.ASSET_BUNDLE_PATH}'.")
+    sys.exit(0)
+
+
+##
+#
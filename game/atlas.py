@@ -0,0 +1,98 @@
+# atlas.py
+
+import sys
+from typing import Iterable
+import pygame
+
+
+# ###############################################    TEXTURE ATLAS    ##################################################
+
+# Every SCACHE item holds its own surface_l and surface_r, so drawing a group switches source surface on every blit.
+# The TextureAtlas copies all those small surfaces (and anything else handed to pack(), e.g. animation frames) into a
+# few big convert_alpha()ed page surfaces and remembers where each one went. Drawing then blits sub-rects of the
+# pages (the blit 'area' argument) in one blits() call per group, so consecutive blits mostly read the same source.
+# Sprites keep their normal .image (still used for collisions, the static layer, etc.) and the atlas finds the region
+# by looking up that surface. A surface that is not in the atlas (loaded after the last pack, or too big for a page)
+# is simply blitted directly, so the atlas being out of date is never wrong, only a bit slower. pack() can be called
+# again at any time to repack everything, e.g. when new assets were loaded at runtime (see SurfaceCache.generation.)
+# Packing is 'shelf' packing: tallest surfaces first, left to right in rows, a new row (shelf) when a row is full, a
+# new page when a page is full. Simple, fast, and good enough for a few dozen sprite images.
+
+AtlasRegion = tuple[pygame.Surface, pygame.Rect]  # (page, area on the page)
+
+
+class TextureAtlas:
+    def __init__(self, page_size: int = 2048, padding: int = 1):
+        self.page_size: int = page_size
+        self.padding: int = padding  # Empty pixels between regions.
+        self.pages: list[pygame.Surface] = []
+        self.regions: dict[pygame.Surface, AtlasRegion] = {}  # Original surface -> where its copy lives.
+        self.generation: int = -1  # Whatever the caller wants to compare with, to know when to repack.
+        self.packs: int = 0
+
+    def pack(self, surfaces: Iterable[pygame.Surface], generation: int = 0) -> None:
+        size, pad = self.page_size, self.padding
+        unique = list(dict.fromkeys(s for s in surfaces if s.get_width() <= size and s.get_height() <= size))
+        unique.sort(key=lambda s: (s.get_height(), s.get_width()), reverse=True)
+
+        placements: list[list[tuple[pygame.Surface, tuple[int, int]]]] = []  # Per page: (surface, topleft)
+        x = y = shelf_h = 0
+        for surface in unique:
+            w, h = surface.get_size()
+            if x + w > size:  # Row full. Next shelf.
+                x, y, shelf_h = 0, y + shelf_h + pad, 0
+            if not placements or y + h > size:  # Page full (or first surface.) Next page.
+                placements.append([])
+                x = y = shelf_h = 0
+            placements[-1].append((surface, (x, y)))
+            x += w + pad
+            shelf_h = max(shelf_h, h)
+
+        self.pages = []
+        self.regions = {}
+        for page_placements in placements:
+            page_w = max(pos[0] + s.get_width() for s, pos in page_placements)
+            page_h = max(pos[1] + s.get_height() for s, pos in page_placements)
+            page = pygame.Surface((page_w, page_h), pygame.SRCALPHA).convert_alpha()
+            page.fill((0, 0, 0, 0))
+            # BLEND_RGBA_MAX onto fully transparent black copies the pixels exactly, alpha included. (A normal blit
+            # would alpha-blend them onto the page.)
+            page.blits([(s, pos, None, pygame.BLEND_RGBA_MAX) for s, pos in page_placements], doreturn=False)
+            for surface, pos in page_placements:
+                self.regions[surface] = (page, pygame.Rect(pos, surface.get_size()))
+            self.pages.append(page)
+        self.generation = generation
+        self.packs += 1
+
+    # (source, dest, area) for every sprite in the atlas, plain (image, dest) for the rest. Ready for Surface.blits().
+    def blit_sequence(self, sprites: Iterable[pygame.sprite.Sprite]) -> list[tuple]:
+        regions = self.regions
+        sequence = []
+        for sprite in sprites:
+            region = regions.get(sprite.image)
+            if region is None:
+                sequence.append((sprite.image, sprite.rect))
+            else:
+                sequence.append((region[0], sprite.rect, region[1]))
+        return sequence
+
+    # Drop-in for group.draw(target)
+    def draw(self, target: pygame.Surface, group: pygame.sprite.Group) -> None:
+        target.blits(self.blit_sequence(group), doreturn=False)
+
+    def stats(self) -> dict:
+        return {
+            'pages': len(self.pages),
+            'page_sizes': [page.get_size() for page in self.pages],
+            'regions': len(self.regions),
+            'packs': self.packs,
+        }
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun atlas.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
@@ -0,0 +1,152 @@
+# bench.py
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Headless. Must be set before pygame is imported (by main.)
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')  # Keep stdout clean for the JSON report.
+import sys
+import ast
+import argparse
+import json
+import random
+import statistics
+import config as cfg
+import inputsource
+import replay
+
+
+# ###############################################    HEADLESS BENCHMARK    #############################################
+
+# Runs the real game loop (main.run) headless, deterministically and as fast as it can go, then prints a JSON report.
+#     * SDL dummy video/audio drivers - no window. Drawing still happens, on the dummy display surface.
+#     * Fixed random seed - the prop spray, meatball spawns etc. come out the same every run.
+#     * Fixed frame count and a fixed simulated delta time per frame - the simulation does not depend on machine speed.
+#     * Uncapped tick rate - clock.tick(0).
+#     * Scripted input - inputsource.demo_script() flies the Player around and fires.
+# So two runs only differ in how long they took, which is what we want to compare between changes.
+# Config settings can be overridden with --set NAME=VALUE (VALUE is a Python literal) to compare modes, e.g.:
+#     python bench.py --frames 2000 --set ENTITY_STORE_ENABLE=True --set DIRTY_RECT_RENDERING=True
+# With --replay LOG, a recorded session (see replay.py, cfg.REPLAY_RECORD_PATH) is benchmarked instead of the scripted
+# one: its seed, frame times and keys are used and it runs to the end of the log (--frames, --seed and --dt are
+# ignored.) The report then also says whether the final simulation state still matches the recording.
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    # Nearest-rank percentile. The values must already be sorted.
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def parse_overrides(assignments: list[str]) -> dict:
+    overrides = {}
+    for assignment in assignments:
+        name, _, value = assignment.partition('=')
+        if not hasattr(cfg, name):
+            raise SystemExit(f"bench.py: unknown config setting: {name}")
+        overrides[name] = ast.literal_eval(value)
+    return overrides
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless deterministic benchmark of the game loop.")
+    parser.add_argument('--frames', type=int, default=1000, help="Frames measured (after warmup.)")
+    parser.add_argument('--warmup', type=int, default=60, help="Frames run first and not measured.")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed.")
+    parser.add_argument('--dt', type=float, default=1.0 / 60, help="Simulated seconds per frame.")
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE', help="Override a config setting.")
+    parser.add_argument('--replay', metavar='LOG', help="Benchmark a recorded session instead of the demo script.")
+    parser.add_argument('--out', help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    overrides = parse_overrides(args.set)
+    for name, value in overrides.items():
+        setattr(cfg, name, value)  # Before importing main, since main reads some settings at import time.
+
+    import main as game
+    if args.replay:
+        game.INPUT = replay.Replayer(args.replay)
+        random.seed(game.INPUT.seed)
+        frame_limit, delta_time = None, None
+    else:
+        game.INPUT = inputsource.demo_script()
+        random.seed(args.seed)
+        frame_limit, delta_time = args.warmup + args.frames, args.dt
+
+    update_times: list[float] = []
+    draw_times: list[float] = []
+    frame_times: list[float] = []
+    entity_counts: list[int] = []
+    frame_index = 0
+
+    def on_frame(update_s: float, draw_s: float, frame_s: float) -> None:
+        nonlocal frame_index
+        frame_index += 1
+        if frame_index <= args.warmup:
+            return
+        update_times.append(update_s)
+        draw_times.append(draw_s)
+        frame_times.append(frame_s)
+        entity_counts.append(len(game.all_sprites))
+
+    game.STARTUP.mark('config')
+    game.init_display()
+    game.preload_assets()
+    game.build_world()
+    game.run(frame_limit=frame_limit, tickrate=0, fixed_delta_time=delta_time, on_frame=on_frame)
+
+    frame_sorted = sorted(frame_times)
+    total_s = sum(frame_times)
+    update_s = sum(update_times)
+    draw_s = sum(draw_times)
+    report = {
+        'frames': len(frame_times),
+        'warmup': args.warmup,
+        'seed': game.INPUT.seed if args.replay else args.seed,
+        'dt': delta_time,
+        'overrides': overrides,
+        'frame_ms': {
+            'mean': 1000 * statistics.fmean(frame_times),
+            'p50': 1000 * percentile(frame_sorted, 50),
+            'p95': 1000 * percentile(frame_sorted, 95),
+            'p99': 1000 * percentile(frame_sorted, 99),
+            'max': 1000 * frame_sorted[-1],
+        },
+        'update_ms_mean': 1000 * update_s / len(frame_times),
+        'draw_ms_mean': 1000 * draw_s / len(frame_times),
+        'update_share': update_s / total_s,
+        'draw_share': draw_s / total_s,
+        'fps': len(frame_times) / total_s,
+        'entities_mean': statistics.fmean(entity_counts),
+        'entities_per_sec': sum(entity_counts) / total_s,  # Entity-frames processed per second of loop time.
+        'startup_ms': game.STARTUP.summary(),  # Time-to-first-frame per startup phase. (The first frame is a warmup one.)
+    }
+    stages = game.PROF.summary()  # Per-stage times. Only with --set PROFILER_ENABLE=True.
+    if stages:
+        report['stages_ms'] = {stage: {'avg': avg_ms, 'max': worst_ms} for stage, (avg_ms, worst_ms) in stages.items()}
+    if args.replay:
+        report['replay'] = args.replay
+        report['replay_matched'] = game.INPUT.matched
+    report['scheduler'] = game.SCHED.stats()
+    if game.WPOOL is not None:
+        report['weapon_pool'] = game.WPOOL.stats()
+    if game.ESTORE is not None:
+        report['entity_store'] = game.ESTORE.stats()
+        game.ESTORE.close()
+    if game.STREAMER is not None:
+        report['streamer'] = game.STREAMER.stats()
+        game.STREAMER.close()
+    game.pygame.quit()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
+    sys.exit(0)
+
+
+##
+#
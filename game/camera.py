@@ -0,0 +1,123 @@
+# camera.py
+
+import sys
+from typing import Iterable
+import pygame
+
+
+# ###################################################    CAMERA    #####################################################
+
+# The world can be bigger than the screen. The Camera is the screen-sized window (view) onto the world: sprites keep
+# world coordinates in their rects and are shifted by the camera position only when drawn. Only sprites whose rect
+# overlaps the view are drawn at all (view culling), so drawing costs follow what is on screen, not the world size.
+# The ChunkedBackground covers the whole world with the background image, tiled. It is never built as one huge surface:
+# the world is split into square chunks which are rendered (and convert()ed) on demand, only near the view. Chunks more
+# than 'margin' chunks away from the view are evicted again, so memory also follows the view, not the world size.
+
+class Camera:
+    def __init__(self, view_size: tuple[int, int], world_size: tuple[int, int]):
+        self.view: pygame.Rect = pygame.Rect((0, 0), view_size)  # World-space area on screen.
+        self.world: pygame.Rect = pygame.Rect((0, 0), world_size)
+
+    # Centers the view on a world position, without showing anything beyond the world edges.
+    def follow(self, center: tuple[float, float]) -> None:
+        self.view.center = (round(center[0]), round(center[1]))
+        self.view.clamp_ip(self.world)
+
+    # Blits the sprites overlapping the view, shifted to screen space. With an atlas.TextureAtlas, from its pages.
+    def draw(self, target: pygame.Surface, sprites: Iterable[pygame.sprite.Sprite], atlas=None) -> None:
+        if atlas is None:
+            target.fblits(self.blit_sequence(sprites))
+        else:
+            target.blits(self.blit_sequence(sprites, atlas), doreturn=False)
+
+    # The blits draw() does, as a sequence. Only (surface, dest) pairs without an atlas, so ready for fblits().
+    def blit_sequence(self, sprites: Iterable[pygame.sprite.Sprite], atlas=None) -> list[tuple]:
+        view = self.view
+        ox, oy = view.topleft
+        collide = view.colliderect
+        if atlas is None:
+            return [(s.image, (s.rect.x - ox, s.rect.y - oy)) for s in sprites if collide(s.rect)]
+        regions = atlas.regions
+        sequence = []
+        for s in sprites:
+            if collide(s.rect):
+                region = regions.get(s.image)
+                if region is None:
+                    sequence.append((s.image, (s.rect.x - ox, s.rect.y - oy)))
+                else:
+                    sequence.append((region[0], (s.rect.x - ox, s.rect.y - oy), region[1]))
+        return sequence
+
+
+class ChunkedBackground:
+    def __init__(self, source: pygame.Surface, chunk_size: int, world_size: tuple[int, int], margin: int = 1):
+        self.source = source  # The background image. Tiled across the world.
+        self.chunk_size: int = chunk_size
+        self.columns: int = -(-world_size[0] // chunk_size)  # Ceiling division.
+        self.rows: int = -(-world_size[1] // chunk_size)
+        self.margin: int = margin  # Chunks kept around the view, so they are ready before they scroll into view.
+        self.chunks: dict[tuple[int, int], pygame.Surface] = {}
+        self.loads: int = 0
+        self.evictions: int = 0
+
+    def chunk_range(self, area: pygame.Rect, margin: int) -> tuple[range, range]:
+        size = self.chunk_size
+        return (
+            range(max(0, area.left // size - margin), min(self.columns, (area.right - 1) // size + 1 + margin)),
+            range(max(0, area.top // size - margin), min(self.rows, (area.bottom - 1) // size + 1 + margin)),
+        )
+
+    def render_chunk(self, column: int, row: int) -> pygame.Surface:
+        size = self.chunk_size
+        chunk = pygame.Surface((size, size)).convert()
+        src_w, src_h = self.source.get_size()
+        left, top = column * size, row * size
+        # Blit the source at every tiling offset that overlaps this chunk. (Up to 4 blits for chunks <= the source.)
+        tile_x = left - left % src_w
+        while tile_x < left + size:
+            tile_y = top - top % src_h
+            while tile_y < top + size:
+                chunk.blit(self.source, (tile_x - left, tile_y - top))
+                tile_y += src_h
+            tile_x += src_w
+        return chunk
+
+    # Loads the chunks near the view and evicts the ones that drifted out of range. Call once per frame, before draw().
+    def update(self, view: pygame.Rect) -> None:
+        columns, rows = self.chunk_range(view, self.margin)
+        chunks = self.chunks
+        for column in columns:
+            for row in rows:
+                if (column, row) not in chunks:
+                    chunks[(column, row)] = self.render_chunk(column, row)
+                    self.loads += 1
+        # Evict with one extra chunk of slack, so a view moving back and forth over a chunk edge does not thrash.
+        keep_columns, keep_rows = self.chunk_range(view, self.margin + 1)
+        for key in [k for k in chunks if k[0] not in keep_columns or k[1] not in keep_rows]:
+            del chunks[key]
+            self.evictions += 1
+
+    def draw(self, target: pygame.Surface, view: pygame.Rect) -> None:
+        size = self.chunk_size
+        columns, rows = self.chunk_range(view, 0)
+        ox, oy = view.topleft
+        chunks = self.chunks
+        target.fblits([(chunks[(c, r)], (c * size - ox, r * size - oy)) for c in columns for r in rows
+                       if (c, r) in chunks])
+
+    def stats(self) -> dict:
+        return {
+            'resident_chunks': len(self.chunks),
+            'loads': self.loads,
+            'evictions': self.evictions,
+        }
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun camera.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
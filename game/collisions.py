@@ -0,0 +1,159 @@
+# collisions.py
+
+import sys
+from typing import Callable, Iterator
+import pygame
+
+
+# ##########################################    SPATIAL HASH COLLISIONS    #############################################
+
+# Broad-phase collision detection on a uniform grid. Every tracked sprite is filed under each grid cell its rect
+# touches. To find colliding pairs between two groups, each sprite of the first group only looks at the sprites of the
+# second group filed under its own cells, so the cost follows the number of NEARBY pairs and not the product of the
+# group sizes (which is what a plain spritecollide() loop costs.)
+# The hash is updated incrementally: after update() moved everything, a sprite is only re-filed if the range of cells
+# its rect covers actually changed. Sprites that left their group are dropped. Only groups that take part in a
+# registered pair are updated at all. Static groups (e.g. props) are filed once, when tracked, and never looked at by
+# update() again: changes to them go through add(), remove() and refile(), called by whoever makes the change.
+# Responses are plain callbacks registered per group pair, called as callback(sprite_a, sprite_b) once per
+# overlapping pair per frame, after all pairs were found. (So a callback may kill() a sprite. Pairs with a sprite that
+# is no longer alive are skipped.)
+
+CellRange = tuple[int, int, int, int]  # (first column, first row, last column, last row) - inclusive.
+
+
+class SpatialHash:
+    def __init__(self, cell_size: int):
+        self.cell_size: int = cell_size
+        self.cells: dict[tuple[int, int], set] = {}
+        self.ranges: dict[pygame.sprite.Sprite, CellRange] = {}
+
+    def cell_range(self, rect: pygame.FRect | pygame.Rect) -> CellRange:
+        size = self.cell_size
+        return int(rect.left // size), int(rect.top // size), int(rect.right // size), int(rect.bottom // size)
+
+    def insert(self, sprite: pygame.sprite.Sprite, cell_range: CellRange) -> None:
+        x0, y0, x1, y1 = cell_range
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = {sprite}
+                else:
+                    cell.add(sprite)
+        self.ranges[sprite] = cell_range
+
+    def remove(self, sprite: pygame.sprite.Sprite) -> None:
+        x0, y0, x1, y1 = self.ranges.pop(sprite)
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells[(cx, cy)]
+                cell.discard(sprite)
+                if not cell:
+                    del cells[(cx, cy)]
+
+    # Re-files a sprite only if the cells it covers changed. Most frames, most sprites stay inside the same cells.
+    def move(self, sprite: pygame.sprite.Sprite) -> None:
+        cell_range = self.cell_range(sprite.rect)
+        old_range = self.ranges.get(sprite)
+        if cell_range != old_range:
+            if old_range is not None:
+                self.remove(sprite)
+            self.insert(sprite, cell_range)
+
+    # Everything filed under the same cells as cell_range. May contain duplicates (a sprite spanning several cells.)
+    def nearby(self, cell_range: CellRange) -> Iterator[pygame.sprite.Sprite]:
+        x0, y0, x1, y1 = cell_range
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    yield from cell
+
+
+class CollisionSystem:
+    def __init__(self, cell_size: int):
+        self.cell_size: int = cell_size
+        self.hashes: dict[str, SpatialHash] = {}  # One spatial hash per tracked group.
+        self.groups: dict[str, pygame.sprite.Group] = {}
+        self.static: dict[str, bool] = {}
+        self.handlers: list[tuple[str, str, Callable]] = []
+        self.paired: list[str] = []  # Non-static tracked groups named in a pair, in tracking order. Updated per frame.
+        self.pairs_found: int = 0  # Overlapping pairs in the last process() call.
+
+    def track(self, name: str, group: pygame.sprite.Group, static: bool = False) -> None:
+        self.hashes[name] = SpatialHash(self.cell_size)
+        self.groups[name] = group
+        self.static[name] = static
+        if static:
+            self.refile(name)
+
+    def on_pair(self, name_a: str, name_b: str, callback: Callable) -> None:
+        self.handlers.append((name_a, name_b, callback))
+        paired = {name for pair in self.handlers for name in pair[:2]}
+        self.paired = [name for name in self.groups if name in paired and not self.static[name]]
+
+    # Files a new member of a static group (or one that moved.)
+    def add(self, name: str, sprite: pygame.sprite.Sprite) -> None:
+        self.hashes[name].move(sprite)
+
+    # Drops a sprite that left a static group.
+    def remove(self, name: str, sprite: pygame.sprite.Sprite) -> None:
+        if sprite in self.hashes[name].ranges:
+            self.hashes[name].remove(sprite)
+
+    # Files every sprite of a group again and drops those no longer in it. For static groups whose sprites changed
+    # size or place, or membership, in bulk.
+    def refile(self, name: str) -> None:
+        spatial_hash = self.hashes[name]
+        members = self.groups[name].spritedict.keys()
+        for sprite in spatial_hash.ranges.keys() - members:
+            spatial_hash.remove(sprite)
+        for sprite in members:
+            spatial_hash.move(sprite)
+
+    # Call once per frame, AFTER all the group update() calls. Static groups are left alone. (See refile().)
+    def update(self) -> None:
+        for name in self.paired:
+            spatial_hash = self.hashes[name]
+            members = self.groups[name].spritedict.keys()  # Dict key views support fast, C-level set operations.
+            for sprite in spatial_hash.ranges.keys() - members:  # Killed or otherwise removed since last frame.
+                spatial_hash.remove(sprite)
+            for sprite in members:
+                spatial_hash.move(sprite)
+
+    # Overlapping (sprite_a, sprite_b) pairs between two tracked groups. Each pair is reported once. For a group paired
+    # with itself, a sprite is never paired with itself and (a, b) and (b, a) count as the same pair.
+    def pairs(self, name_a: str, name_b: str) -> Iterator[tuple[pygame.sprite.Sprite, pygame.sprite.Sprite]]:
+        hash_a, hash_b = self.hashes[name_a], self.hashes[name_b]
+        same = name_a == name_b
+        for sprite_a, cell_range in hash_a.ranges.items():
+            rect_a = sprite_a.rect
+            seen = set()
+            for sprite_b in hash_b.nearby(cell_range):
+                if sprite_b in seen or (same and id(sprite_b) <= id(sprite_a)):
+                    continue
+                seen.add(sprite_b)
+                if rect_a.colliderect(sprite_b.rect):
+                    yield sprite_a, sprite_b
+
+    def process(self) -> None:
+        self.pairs_found = 0
+        for name_a, name_b, callback in self.handlers:
+            found = list(self.pairs(name_a, name_b))  # Collect first. Callbacks may kill sprites.
+            self.pairs_found += len(found)
+            for sprite_a, sprite_b in found:
+                if sprite_a.alive() and sprite_b.alive():
+                    callback(sprite_a, sprite_b)
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun collisions.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
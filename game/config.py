@@ -8,6 +8,11 @@ import collections
 
 SCREEN_WIDTH: int = 1640
 SCREEN_HEIGHT: int = 860
+WORLD_WIDTH: int = SCREEN_WIDTH  # The area entities live and bounce in. Can be bigger than the screen with CAMERA_ENABLE.
+WORLD_HEIGHT: int = SCREEN_HEIGHT
+CAMERA_ENABLE: bool = False  # Scrolling view following the player, with view culling. Needed to see a bigger world.
+BG_CHUNK_SIZE: int = 256  # With the camera, the background is tiled over the world in chunks of this size (pixels.)
+BG_CHUNK_MARGIN: int = 1  # Chunks beyond the view edges kept loaded, so they are ready before they scroll in.
 
 TICKRATE: int = 60  # (frame rate) - 0/None gives maximum/unlimited. Depends on code but recently saw 500-1000 FPS.
 GAME_TITLE: str = 'Goldfish Picnic'
@@ -15,19 +20,62 @@ GAME_TITLE: str = 'Goldfish Picnic'
 BGCOLOR: str = 'olivedrab'
 BGIMG: str = 'grass-field-med-1920x1249.jpg'  # 'grass-field-med-1920x1249.jpg'  # 'lawn-bg-dark-2560x1440.jpg'
 ASSET_PATH: str = 'assets'  # Relative path with no trailing slash.
+ASSET_BUNDLE_ENABLE: bool = False  # Load pre-processed pixels from a memory-mapped bundle. Auto-rebuilt when stale.
+ASSET_BUNDLE_PATH: str = 'assets.bundle'  # Build it ahead of time with: python assets.py
+PRELOAD_ENABLE: bool = True  # Decode/resize all spec images concurrently before instantiation. See preload_images().
+PRELOAD_WORKERS: int | None = None  # Preload thread pool size. None = one per CPU core (ThreadPoolExecutor default.)
+STREAMING_ENABLE: bool = False  # Load images on background threads, by priority, behind a loading screen. See streamloader.py.
+STREAM_WORKERS: int = 2  # Streaming loader threads.
+STREAM_BLOCKING_PRIORITY: int = 1  # The loading screen waits for images up to this priority. (1 = player + weapons.)
+STREAM_FRAME_BUDGET_MS: float = 2.0  # Main-thread time per frame for finishing streamed images (convert_alpha, flips.)
+STREAM_PLACEHOLDER_COLOR: tuple[int, int, int, int] = (128, 128, 128, 96)  # RGBA of the stand-in for unloaded images.
+STREAM_PLACEHOLDER_SIZE: int = 32  # Placeholder width/height for images of unknown (native) size.
+SCACHE_BUDGET_BYTES: int = 0  # Surface cache memory budget. Least-recently-used variants are evicted beyond it. 0 = no limit.
 DEBUG: bool = False
 ACID_MODE: bool = False  # Suppress background re-painting. This makes objects leave psychedelic trails for a fun effect.
+ENTITY_STORE_ENABLE: bool = False  # Npc/Weapon/Prop motion runs vectorized in a NumPy EntityStore. For huge spawn counts.
+STATIC_PROP_LAYER: bool = False  # Bake background + props into one surface. One blit/frame. Re-baked when props change.
+DIRTY_RECT_RENDERING: bool = False  # Repaint/update only where sprites were and are. Full flip() when too much changed.
+DIRTY_RECT_MAX_FRACTION: float = 0.5  # Fall back to a full flip() when dirty rects cover more than this much of the screen.
+COLLISIONS_ENABLE: bool = False  # Spatial-hash collision detection with responses (projectile hits, NPC bounces.)
+COLLISION_CELL_SIZE: int = 128  # Spatial hash grid cell size in pixels. Roughly the size of a typical sprite works well.
+FIXED_TIMESTEP_ENABLE: bool = False  # Simulate in fixed steps of 1/SIM_RATE sec, independent of the frame (render) rate.
+SIM_RATE: int = 60  # Simulation steps per second with FIXED_TIMESTEP_ENABLE. ENVIRO_PHASES lengths then count these steps.
+SIM_MAX_STEPS_PER_FRAME: int = 8  # After a long stall, run at most this many steps in one frame and drop the rest.
+SIM_INTERPOLATE: bool = True  # Draw moving sprites between their last two simulated positions, for smooth motion.
+TEXTURE_ATLAS_ENABLE: bool = False  # Draw sprites from a few big atlas pages (blit area) instead of one surface each.
+TEXTURE_ATLAS_PAGE_SIZE: int = 2048  # Max atlas page width/height. Images bigger than this are drawn directly.
+SPRITE_VARIANTS_ENABLE: bool = False  # Sprites face their actual heading, with cached rotated (and scaled) variants.
+SPRITE_VARIANT_ANGLE_STEPS: int = 32  # Heading buckets per full turn. 16 to 64 is sensible. (Max 127.)
+SPRITE_VARIANT_SCALE_STEP: float = 0.25  # Sprite scales are rounded to multiples of this.
+SPRITE_VARIANT_BUDGET_BYTES: int = 64 * 1024 * 1024  # Variant cache memory budget. LRU eviction beyond it. 0 = no limit.
+RANDOM_SEED: int | None = None  # Fixed seed for 'random' (prop spray, meatballs.) None = a new seed every run.
+REPLAY_RECORD_PATH: str | None = None  # Record seed, frame times and keys to this file. See replay.py.
+REPLAY_PLAY_PATH: str | None = None  # Replay a recording instead of live input. Reports if the end state matches.
+PROP_SPRAY_COUNT_SCALE: float = 1.0  # Multiplies every prop template's spray_count. For dense (50k+ prop) scenes.
+PROP_SPRAY_MIN_SPACING: float = 0.0  # Poisson-disk spray: sprayed props of a template at least this far apart. 0 = off.
+PROP_SPRAY_BAKE_ONLY: bool = False  # With STATIC_PROP_LAYER, sprayed props are only baked into the layer. No Prop sprites.
+RENDER_QUEUE_ENABLE: bool = False  # Draw all sprite groups (in layer order) with one fblits() call instead of Group.draw().
+SHARD_WORKERS: int = 0  # With ENTITY_STORE_ENABLE, move entities in this many worker processes (world strips.) 0 = off.
+SHARD_CAPACITY: int = 65536  # Fixed slot count of the shared-memory entity arrays with SHARD_WORKERS.
+STARTUP_REPORT: bool = False  # Print time-to-first-frame per startup phase (import, config, ..., world build, first frame.)
+PROFILER_ENABLE: bool = False  # Time every main loop stage and sprite group, every frame. Low overhead.
+PROFILER_OVERLAY: bool = False  # Start with the live profiler overlay showing. Toggle it in-game with PROFILER_OVERLAY_KEY.
+PROFILER_OVERLAY_KEY: str = 'f3'  # pygame key name, as used by pygame.key.key_code().
+PROFILER_WINDOW: int = 120  # Frames covered by the rolling averages and worst-case times.
+PROFILER_TRACE_PATH: str | None = None  # Write per-frame stage timings here on exit. '.json' = Chrome trace, else CSV.
 
 LASER_COOLDOWN_DURATION: int = 100  # Milliseconds - minimum time between laser firing
 PROJECTILE_MARGIN: int = 160  # Distane beyond wall on X or Y axis at which projectile/Weapon is "Finalized"
 PLAYER_MAIN_WEAPON_INDEX: int = 0  # Index in weapon_specs of the weapon_spec item to use for the Player's main projectile.
 # 0 = green ball    1 = meatball
+WEAPON_POOL_ENABLE: bool = True  # Reuse preallocated Weapons (projectiles, meatballs) instead of building new ones.
+WEAPON_POOL_CAPACITY: int = 256  # Weapons preallocated at startup.
+WEAPON_POOL_EXHAUSTED: str = 'grow'  # When all are live: 'grow' (build more), 'drop' (skip spawn), 'recycle' (reuse oldest)
 
-PYGAME_FROMBYTES_IMAGE_LOAD_WORKAROUND_ENABLE: bool = True
 MEATBALL_SPAWN_MARGIN: int = 60  # Meatballs can spawn this far slightly to the left/right and above the screen.
 MEATBALL_SPAWN_TIME_MIN: int = 20  # They spawn no faster than this but a small random-in-range pause is added too.
-MEATBALL_SPAWN_TIME_RANGE: int = 500  # Random from 0 to this range max is then ADDED TO THE MINIMUM.
-# TODO: Meatball spawn time with current timer is only set randomly once at game start. MAKE IT VARY ALL THE TIME.
+MEATBALL_SPAWN_TIME_RANGE: int = 500  # Random from 0 to this max, ADDED TO THE MINIMUM. New for every spawn.
 
 # List of tuples of the phase name and the phase duration in frames/iterations. collections.deque.popleft() is said
 # to be efficient at popping from the left side of a list. I'm just giving it a try. There are many ways to rotate a list.
@@ -0,0 +1,92 @@
+# dirtyrects.py
+
+import sys
+import pygame
+
+
+# ############################################    DIRTY RECT RENDERER    ###############################################
+
+# Instead of repainting the whole background and calling pygame.display.flip() every frame, the DirtyRectRenderer only
+# restores the background under the rects where sprites were drawn LAST frame, draws the sprites, and hands the old
+# plus new rects to pygame.display.update(). Only those areas are pushed to the screen, which cuts fill-rate costs a
+# lot when a few small sprites move over a big, mostly unchanged screen.
+# If the dirty rects add up to more than max_dirty_fraction of the screen, tracking them is no longer worth it and a
+# normal full repaint + flip() is done instead. A full repaint is also done on the first frame and after the
+# background changes (set_background.)
+# Static groups (props) are composited onto a copy of the background on a full repaint, and that composite is what
+# gets restored under moved sprites. Drawing them again every frame would alpha-blend their soft edges onto themselves
+# over and over. Call set_background() (again) if the static groups' membership changes, to rebuild the composite.
+# ACID_MODE is honoured: the background is never restored, so trails stay, and only the new sprite rects are updated.
+# With an atlas (atlas.TextureAtlas), sprites are blitted from the atlas pages instead of from their own images.
+
+class DirtyRectRenderer:
+    def __init__(self, screen: pygame.Surface, background: pygame.Surface, max_dirty_fraction: float, acid: bool,
+                 atlas=None):
+        self.screen = screen
+        self.atlas = atlas
+        self.background = background
+        self.composite: pygame.Surface | None = None  # Background + static groups. Built on the next full repaint.
+        self.max_dirty_area: float = max_dirty_fraction * screen.get_width() * screen.get_height()
+        self.acid: bool = acid
+        self.prev_rects: list[pygame.Rect] = []  # Screen areas covered by sprites in the previous frame.
+        self.full_redraw: bool = True
+        self.full_frames: int = 0  # Frames that fell back to a full repaint + flip().
+        self.dirty_frames: int = 0  # Frames pushed with display.update(rects).
+
+    def set_background(self, background: pygame.Surface) -> None:
+        self.background = background
+        self.composite = None
+        self.full_redraw = True
+
+    def draw_static(self, target: pygame.Surface, group: pygame.sprite.Group) -> None:
+        if self.atlas is None:
+            target.fblits([(sprite.image, sprite.rect) for sprite in group])
+        else:
+            target.blits(self.atlas.blit_sequence(group), doreturn=False)
+
+    # static_groups are never tracked, since they never move. They are part of the composite (see above.) With a baked
+    # static layer as the background, pass no static groups and the background itself is the composite.
+    def draw(self, static_groups: list[pygame.sprite.Group], dynamic_groups: list[pygame.sprite.Group]) -> None:
+        screen = self.screen
+        atlas = self.atlas
+        if self.acid:  # Nothing is restored, so the static groups are simply drawn every frame, like the sprites.
+            for group in static_groups:
+                self.draw_static(screen, group)
+        else:
+            if self.composite is None:
+                self.composite = self.background
+                if static_groups:
+                    self.composite = self.background.convert()  # A copy, in the display format (as the screen blends.)
+                    for group in static_groups:
+                        self.draw_static(self.composite, group)
+                self.full_redraw = True
+            if self.full_redraw:
+                screen.blit(self.composite, (0, 0))
+            else:
+                screen.blits([(self.composite, rect, rect) for rect in self.prev_rects], doreturn=False)
+
+        rects: list[pygame.Rect] = []
+        for group in dynamic_groups:
+            if atlas is None:
+                rects += screen.blits([(sprite.image, sprite.rect) for sprite in group])  # The clipped, drawn areas.
+            else:
+                rects += screen.blits(atlas.blit_sequence(group))
+
+        dirty = rects if self.acid else self.prev_rects + rects
+        self.prev_rects = rects
+        if self.full_redraw or sum(rect.w * rect.h for rect in dirty) > self.max_dirty_area:
+            self.full_redraw = False
+            self.full_frames += 1
+            pygame.display.flip()
+        else:
+            self.dirty_frames += 1
+            pygame.display.update(dirty)
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun dirtyrects.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
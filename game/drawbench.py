@@ -0,0 +1,116 @@
+# drawbench.py
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Headless. Must be set before pygame is imported (by main.)
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')  # Keep stdout clean for the JSON report.
+import argparse
+import json
+import random
+import statistics
+import time
+import pygame
+import entity
+import renderqueue
+
+
+# ###############################################    DRAW BENCHMARK    #################################################
+
+# Draw time against sprite count: the per-group Group.draw() path versus the RenderQueue (one fblits() per frame.)
+# The game's own images are used. For each count, that many sprites are spread over the four layer groups (props,
+# NPCs, weapons, players) at random on-screen positions, and both paths draw the same frame (background blit plus all
+# groups, no flip) repeatedly. The report has the median milliseconds per frame for each path, the speedup, and
+# whether both paths produced exactly the same pixels.
+#     python drawbench.py --counts 100 1000 10000 50000 --frames 60
+#     python drawbench.py --size 8    # Tiny sprites: mostly per-sprite overhead, little pixel work.
+
+def group_draw(target: pygame.Surface, background: pygame.Surface, groups: list[pygame.sprite.Group]) -> None:
+    target.blit(background, (0, 0))
+    for group in groups:
+        group.draw(target)
+
+
+def queue_draw(target: pygame.Surface, background: pygame.Surface, groups: list[pygame.sprite.Group],
+               queue: renderqueue.RenderQueue) -> None:
+    target.blit(background, (0, 0))
+    for group in groups:
+        queue.push(group)
+    queue.submit(target)
+
+
+def time_ms(draw, frames: int) -> float:
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        draw()
+        times.append(time.perf_counter() - start)
+    return 1000 * statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sprite draw time against sprite count: Group.draw() vs RenderQueue.")
+    parser.add_argument('--counts', type=int, nargs='+', default=[100, 1000, 5000, 10000, 50000], help="Sprite counts.")
+    parser.add_argument('--frames', type=int, default=60, help="Frames timed per path and count.")
+    parser.add_argument('--size', type=int, help="Scale every image down to this height (px), so per-sprite overhead "
+                                                 "rather than pixel blending dominates.")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed.")
+    parser.add_argument('--out', help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    import main as game
+    random.seed(args.seed)
+    game.init_display()
+    game.preload_assets()
+    game.build_world()
+    target = game.display_surface
+    width, height = target.get_size()
+    background = pygame.Surface((width, height)).convert()
+    background.fill('black')
+    layers = [game.all_props, game.all_npcs, game.all_weapons, game.all_players]
+    # The images of each layer, from the sprites the world was built with. Weapons use the projectile images.
+    images = [[sprite.image for sprite in group] for group in layers]
+    images[2] = [game.SCACHE.get(spec.img_key)['surface_r'] for spec in entity.weapon_records]
+    images = [layer_images or images[1] for layer_images in images]  # No props with the static layer, say.
+    if args.size:
+        images = [[pygame.transform.smoothscale_by(image, args.size / image.get_height()) for image in layer_images]
+                  for layer_images in images]
+
+    results = []
+    for count in args.counts:
+        groups = [pygame.sprite.Group() for _ in layers]
+        for i in range(count):
+            layer = i % len(layers)
+            sprite = pygame.sprite.Sprite(groups[layer])
+            sprite.image = random.choice(images[layer])
+            sprite.rect = sprite.image.get_frect(center=(random.uniform(0, width), random.uniform(0, height)))
+        queue = renderqueue.RenderQueue()
+
+        group_draw(target, background, groups)
+        expected = target.copy()
+        queue_draw(target, background, groups, queue)
+        identical = pygame.image.tobytes(target, 'RGB') == pygame.image.tobytes(expected, 'RGB')
+
+        group_ms = time_ms(lambda: group_draw(target, background, groups), args.frames)
+        queue_ms = time_ms(lambda: queue_draw(target, background, groups, queue), args.frames)
+        results.append({
+            'sprites': count,
+            'group_draw_ms': group_ms,
+            'render_queue_ms': queue_ms,
+            'speedup': group_ms / queue_ms,
+            'identical': identical,
+        })
+    pygame.quit()
+
+    text = json.dumps({'frames': args.frames, 'size': args.size, 'seed': args.seed, 'results': results}, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
+
+
+##
+#
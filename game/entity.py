@@ -2,7 +2,7 @@
 
 import sys
 import pygame.math  # For pygame.math.Vector2 only.
-from typing import TypedDict
+from typing import NamedTuple, TypedDict
 
 
 # ###########################################    ENTITY SPECIFICATIONS    ##############################################
@@ -293,6 +293,48 @@ PropSpec = TypedDict('PropSpec',
 )  # PropSpec
 
 
+# ###########################################    COMPILED SPEC RECORDS    ##############################################
+
+# The spec dicts above are the authoring format. The game reads specs through SpecRecords instead, compiled from them
+# once at import: immutable named tuples, so a field is a fixed tuple slot (spec.s) instead of a string-keyed dict
+# lookup (spec['s']), and the image key is built once instead of on every spawn. The direction is a plain (x, y) tuple,
+# since a record must not hand out a mutable Vector2. Every Entity builds its own Vector2 from it.
+# instance_id is not compiled. Entities number themselves. (See instance_id on the Entity classes in main.py.)
+class SpecRecord(NamedTuple):
+    name: str
+    img_key: tuple[str, bool, bool, int, int]  # assets.ImageKey (img_filename, flip, resize, w, h)
+    color: str
+    x: float
+    y: float
+    d: tuple[float, float]  # Direction
+    s: float  # Initial/default speed
+    p: float  # Enviro: Peace (speed)
+    r: float  # Enviro: Rogue (speed)
+    c: float  # Enviro: Chaos (speed)
+    f: float  # Enviro: Frozen (speed)
+
+
+def compile_spec(spec: PlayerSpec | WeaponSpec | NpcSpec) -> SpecRecord:
+    return SpecRecord(
+        name=spec['name'],
+        img_key=(spec['img_filename'], spec['flip'], spec['resize'], spec['w'], spec['h']),
+        color=spec['color'],
+        x=spec['x'],
+        y=spec['y'],
+        d=(spec['d'].x, spec['d'].y),
+        s=spec['s'],
+        p=spec['p'],
+        r=spec['r'],
+        c=spec['c'],
+        f=spec['f'],
+    )
+
+
+player_records: tuple[SpecRecord, ...] = tuple(compile_spec(spec) for spec in player_specs)
+weapon_records: tuple[SpecRecord, ...] = tuple(compile_spec(spec) for spec in weapon_specs)
+npc_records: tuple[SpecRecord, ...] = tuple(compile_spec(spec) for spec in npc_specs)
+
+
 if __name__ == '__main__':
     print("WARNING: PyGameFun entity.py has been run directly, however it is only meant to be imported.")
     sys.exit(1)
@@ -0,0 +1,240 @@
+# entitystore.py
+
+import sys
+import numpy
+import pygame
+import config as cfg
+
+
+# ############################################    ENTITY STORE (SoA)    ################################################
+
+# The EntityStore is an opt-in structure-of-arrays (SoA) home for the motion state of many sprites. Instead of every
+# Npc, Weapon and Prop running its own Entity.update() and physics_outer_walls() with Vector2 math and four if-checks,
+# the store keeps positions, directions, speeds and rect extents in NumPy arrays and runs moves, wall bounces,
+# projectile finalization and left/right image selection as a handful of whole-array operations per frame.
+# With heading_steps set (sprite variants, see variants.py), the facing codes are heading buckets instead of left/right,
+# and sprites whose bucket changed get Entity.apply_heading() called.
+# The sprites remain ordinary sprites in their groups. After the array math, the store writes the new rect centers
+# (and images, only where the facing changed) back to the sprites so the existing Group.draw() calls keep working.
+# With a view set (the camera's, when nothing else reads the rects), only the rects of sprites near the view are
+# written back. The rest keep their last written rect until they come near it again, so the cost of the write-back
+# follows what is on screen. Anything that needs every position (e.g. the replay state digest) calls sync_rects() first.
+# While a sprite is registered, THE STORE IS THE SOURCE OF TRUTH for its position, direction and speed.
+
+# Wall behaviour codes. These mirror the three flavors of physics_outer_walls() in main.py.
+WALLS_BOUNCE: int = 0  # Entity default - bounce off all four outer walls.
+WALLS_PROJECTILE: int = 1  # Weapon - no bounce, finalized (killed) beyond cfg.PROJECTILE_MARGIN.
+WALLS_NONE: int = 2  # Prop - ignores walls completely.
+
+FACING_UNSET: int = -1  # Forces an image assignment on the first update after a sprite is added.
+FACING_LEFT: int = 1  # dir.x < 0 gives surface_l
+FACING_RIGHT: int = 0  # Otherwise surface_r (Same rule as Entity.update(). Note that dir.x == 0 gives RIGHT.)
+
+
+# Every per-sprite array of the store: (attribute name, dtype). Slot i of every array belongs to the same sprite.
+FIELDS: tuple[tuple[str, type], ...] = (
+    ('x', numpy.float64),  # rect center X
+    ('y', numpy.float64),  # rect center Y
+    ('dx', numpy.float64),  # Direction X
+    ('dy', numpy.float64),  # Direction Y
+    ('speed', numpy.float64),
+    ('half_w', numpy.float64),  # Half of rect width (rect extents)
+    ('half_h', numpy.float64),  # Half of rect height
+    ('walls', numpy.int8),  # WALLS_* code
+    ('facing', numpy.int8),  # FACING_* code of the currently assigned image
+    ('shown_x', numpy.float64),  # rect center X last written to the sprite. (Differs from x while culled by the view.)
+    ('shown_y', numpy.float64),  # rect center Y last written to the sprite
+)
+VIEW_MARGIN: int = 256  # Pixels around the view that are written back too. The camera moves after the update.
+
+
+# The motion rules, on whole arrays, IN PLACE: move, wall bounce and projectile finalization.
+# Returns (bounced, finalized) boolean masks. Shared with the shard workers (see shardsim.py), which run it on the
+# slots of their own region.
+def move_and_bounce(x, y, dx, dy, speed, half_w, half_h, walls, delta_time: float,
+                    world_width: float, world_height: float, margin: float) -> tuple[numpy.ndarray, numpy.ndarray]:
+    # MOVE
+    step = speed * delta_time
+    x += dx * step
+    y += dy * step
+
+    # BOUNCE - Same order and same <=/>= comparisons as Entity.physics_outer_walls().
+    bouncers = walls == WALLS_BOUNCE
+    hit = bouncers & (x - half_w <= 0)  # LEFT wall
+    x[hit] = half_w[hit]
+    dx[hit] *= -1
+    bounced = hit
+    hit = bouncers & (x + half_w >= world_width)  # RIGHT wall
+    x[hit] = world_width - half_w[hit]
+    dx[hit] *= -1
+    bounced |= hit
+    hit = bouncers & (y - half_h <= 0)  # TOP wall
+    y[hit] = half_h[hit]
+    dy[hit] *= -1
+    bounced |= hit
+    hit = bouncers & (y + half_h >= world_height)  # BOTTOM wall
+    y[hit] = world_height - half_h[hit]
+    dy[hit] *= -1
+    bounced |= hit
+
+    # PROJECTILE FINALIZATION - Weapons a little beyond any wall are killed.
+    finalized = (walls == WALLS_PROJECTILE) & (
+        (x - half_w <= 0 - margin) | (x + half_w >= world_width + margin) |
+        (y - half_h <= 0 - margin) | (y + half_h >= world_height + margin)
+    )
+    return bounced, finalized
+
+
+class EntityStore:
+    def __init__(self, capacity: int = 1024, heading_steps: int = 0):
+        self.heading_steps: int = heading_steps  # 0 means plain left/right facing.
+        self.count: int = 0
+        self.sprites: list = []  # Index-aligned with the arrays. Slot i of every array belongs to self.sprites[i].
+        self.fields: tuple[tuple[str, type], ...] = FIELDS  # One array attribute per field, set by _allocate().
+        self.view: pygame.Rect | None = None  # World area rects are written back for. None = all of them.
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        for name, dtype in self.fields:
+            setattr(self, name, numpy.zeros(capacity, dtype=dtype))
+
+    def _grow(self) -> None:
+        new_capacity = 2 * len(self.x)
+        for name, dtype in self.fields:
+            old = getattr(self, name)
+            new = numpy.zeros(new_capacity, dtype=dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, sprite, walls: int) -> None:
+        if self.count == len(self.x):
+            self._grow()
+        i = self.count
+        self.x[i], self.y[i] = self.shown_x[i], self.shown_y[i] = sprite.rect.center
+        self.dx[i] = sprite.dir.x
+        self.dy[i] = sprite.dir.y
+        self.speed[i] = sprite.speed
+        self.half_w[i] = sprite.rect.width / 2
+        self.half_h[i] = sprite.rect.height / 2
+        self.walls[i] = walls
+        self.facing[i] = FACING_UNSET
+        self.sprites.append(sprite)
+        sprite.store_index = i
+        self.count += 1
+
+    def remove(self, sprite) -> None:
+        # Swap-remove: the last slot is moved into the hole, so removal is O(1) and the arrays stay dense.
+        i = sprite.store_index
+        last = self.count - 1
+        if i != last:
+            for name, _ in self.fields:
+                arr = getattr(self, name)
+                arr[i] = arr[last]
+            moved = self.sprites[last]
+            self.sprites[i] = moved
+            moved.store_index = i
+        self.sprites.pop()
+        sprite.store_index = -1
+        self.count = last
+
+    def set_motion(self, sprite, dx: float, dy: float, speed: float) -> None:
+        i = sprite.store_index
+        self.dx[i] = dx
+        self.dy[i] = dy
+        self.speed[i] = speed
+
+    # One speed for many sprites at once (e.g. an environment phase change.) Sprites not in the store are skipped.
+    def set_speeds(self, sprites, speed: float) -> None:
+        indices = [sprite.store_index for sprite in sprites if sprite.store_index >= 0]
+        if indices:
+            self.speed[indices] = speed
+
+    def update(self, delta_time: float) -> None:
+        if self.count == 0:
+            return
+        bounced, finalized = self.step(delta_time)
+        self.write_back(bounced, finalized)
+
+    # Runs the motion rules on all slots. Returns the (bounced, finalized) masks for write_back().
+    def step(self, delta_time: float) -> tuple[numpy.ndarray, numpy.ndarray]:
+        n = self.count
+        return move_and_bounce(self.x[:n], self.y[:n], self.dx[:n], self.dy[:n], self.speed[:n], self.half_w[:n],
+                               self.half_h[:n], self.walls[:n], delta_time,
+                               cfg.WORLD_WIDTH, cfg.WORLD_HEIGHT, cfg.PROJECTILE_MARGIN)
+
+    # Brings the sprites up to date with the arrays: image selection, rects, directions of bounced sprites and kills.
+    def write_back(self, bounced: numpy.ndarray, finalized: numpy.ndarray) -> None:
+        n = self.count
+        x, y, dx, dy, speed = self.x[:n], self.y[:n], self.dx[:n], self.dy[:n], self.speed[:n]
+
+        # IMAGE SELECTION - Only sprites whose facing actually changed get a new image assigned.
+        if self.heading_steps:  # Heading bucket, the same quantization as VariantCache.angle_bucket(). Kept when not moving.
+            step = 360.0 / self.heading_steps
+            facing = (numpy.rint(numpy.degrees(numpy.arctan2(-dy, dx)) / step) % self.heading_steps).astype(numpy.int8)
+            facing = numpy.where((dx != 0) | (dy != 0), facing, self.facing[:n])
+        else:
+            facing = numpy.where(dx < 0, FACING_LEFT, FACING_RIGHT).astype(numpy.int8)
+        flipped = numpy.flatnonzero(facing != self.facing[:n])
+        self.facing[:n] = facing
+
+        # WRITE BACK - Rects only for sprites that can move. (Props have zero speed so they are skipped after frame 1.)
+        #     With a view, only for those near it, either where they are now or where their rect still shows them.
+        sprites = self.sprites
+        writes = speed != 0
+        if self.view is not None:
+            writes &= self.near_view(x, y) | self.near_view(self.shown_x[:n], self.shown_y[:n])
+        movers = numpy.flatnonzero(writes)
+        centers_x, centers_y = x[movers], y[movers]
+        self.shown_x[movers] = centers_x
+        self.shown_y[movers] = centers_y
+        for i, cx, cy in zip(movers.tolist(), centers_x.tolist(), centers_y.tolist()):
+            sprites[i].rect.center = (cx, cy)
+        if self.heading_steps:
+            for i in flipped.tolist():
+                sprites[i].apply_heading(int(facing[i]))  # Also updates this store's half_w/half_h for the new size.
+        else:
+            for i in flipped.tolist():
+                sprite = sprites[i]
+                sprite.image = sprite.surface_l if facing[i] == FACING_LEFT else sprite.surface_r
+        for i in numpy.flatnonzero(bounced).tolist():  # Keep the sprite's Vector2 in step for code that reads it.
+            sprites[i].dir.update(dx[i], dy[i])
+
+        # Kill last and in descending index order, since kill() swap-removes from this store.
+        for i in numpy.flatnonzero(finalized)[::-1].tolist():
+            sprites[i].kill()
+
+    # Mask of the slots centered on (cx, cy) whose rect may come within VIEW_MARGIN of the view. Measured with the
+    # largest rect of the store, which makes it two scalar distance checks per slot.
+    def near_view(self, cx: numpy.ndarray, cy: numpy.ndarray) -> numpy.ndarray:
+        n = self.count
+        view = self.view
+        reach_x = view.width / 2 + VIEW_MARGIN + float(self.half_w[:n].max())
+        reach_y = view.height / 2 + VIEW_MARGIN + float(self.half_h[:n].max())
+        return (numpy.abs(cx - view.centerx) <= reach_x) & (numpy.abs(cy - view.centery) <= reach_y)
+
+    # Writes every rect back, also those culled by the view.
+    def sync_rects(self) -> None:
+        n = self.count
+        for sprite, cx, cy in zip(self.sprites, self.x[:n].tolist(), self.y[:n].tolist()):
+            sprite.rect.center = (cx, cy)
+        self.shown_x[:n] = self.x[:n]
+        self.shown_y[:n] = self.y[:n]
+
+    # Releases whatever the store holds beyond its arrays. Nothing for this in-process store.
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {
+            'entities': self.count,
+            'capacity': len(self.x),
+        }
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun entitystore.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
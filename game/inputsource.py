@@ -0,0 +1,108 @@
+# inputsource.py
+
+import sys
+import pygame
+
+
+# ##############################################    INPUT SOURCES    ###################################################
+
+# The main loop polls exactly one input source once per frame (in the INPUT stage) and the Player reads the key state
+# from it, instead of calling pygame.key.get_pressed() itself. That makes the input swappable: LiveInput is the real
+# keyboard, ScriptedInput plays a fixed, frame-indexed script so headless runs (bench.py) are deterministic.
+# Both expose the same two indexable key states as pygame does: 'pressed' (held now) and 'just_pressed' (went down
+# this frame.)
+# With a fixed simulation timestep, a frame can run zero, one or several simulation steps, so the main loop calls
+# consume() after every simulation step. Until a step has seen them, newly pressed keys keep collecting in
+# 'just_pressed' (a press in a frame without a step is not lost) and after it 'just_pressed' is empty (a press fires
+# only once even when the frame runs several steps.)
+
+class KeySet:
+    # Indexable like pygame's ScancodeWrapper: key_set[pygame.K_SPACE] -> bool
+    def __init__(self, keys: frozenset[int]):
+        self.keys = keys
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.keys
+
+
+NO_KEYS = KeySet(frozenset())
+
+
+class KeyUnion:
+    # Key states merged over several polls: key_union[key] -> True if down in any of them. (pygame's ScancodeWrapper
+    # can be indexed but not iterated, so the merge is done at lookup time.)
+    def __init__(self, first, second):
+        self.first = first
+        self.second = second
+
+    def __getitem__(self, key: int) -> bool:
+        return self.first[key] or self.second[key]
+
+
+class LiveInput:
+    def __init__(self):
+        self.pressed = NO_KEYS
+        self.just_pressed = NO_KEYS
+        self.pending: bool = False  # just_pressed holds presses no simulation step has seen yet.
+
+    def poll(self) -> None:
+        self.pressed = pygame.key.get_pressed()
+        just_pressed = pygame.key.get_just_pressed()
+        if self.pending:  # Only when a frame ran no simulation step. Merge instead of replacing.
+            self.just_pressed = KeyUnion(self.just_pressed, just_pressed)
+        else:
+            self.just_pressed = just_pressed
+        self.pending = True
+
+    def consume(self) -> None:
+        self.just_pressed = NO_KEYS
+        self.pending = False
+
+
+# script: list of (first_frame, last_frame, keys) - the keys are held on every frame from first_frame to last_frame
+# inclusive. Overlapping entries combine. When 'loop' is set, the script repeats with a period of loop frames.
+ScriptEntry = tuple[int, int, tuple[int, ...]]
+
+
+class ScriptedInput:
+    def __init__(self, script: list[ScriptEntry], loop: int = 0):
+        self.script = script
+        self.loop: int = loop
+        self.frame: int = -1
+        self.pressed = NO_KEYS
+        self.just_pressed = NO_KEYS
+        self.pending: bool = False
+
+    def poll(self) -> None:
+        self.frame += 1
+        frame = self.frame % self.loop if self.loop else self.frame
+        held = frozenset(key for first, last, keys in self.script if first <= frame <= last for key in keys)
+        just_pressed = held - self.pressed.keys
+        self.just_pressed = KeySet(self.just_pressed.keys | just_pressed if self.pending else just_pressed)
+        self.pressed = KeySet(held)
+        self.pending = True
+
+    def consume(self) -> None:
+        self.just_pressed = NO_KEYS
+        self.pending = False
+
+
+# A simple deterministic workout for the Player: fly a square and tap fire (SPACE) every 10 frames. 240 frames/loop.
+def demo_script() -> ScriptedInput:
+    script: list[ScriptEntry] = [
+        (0, 59, (pygame.K_RIGHT,)),
+        (60, 119, (pygame.K_DOWN,)),
+        (120, 179, (pygame.K_LEFT,)),
+        (180, 239, (pygame.K_UP,)),
+    ]
+    script += [(frame, frame, (pygame.K_SPACE,)) for frame in range(0, 240, 10)]
+    return ScriptedInput(script, loop=240)
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun inputsource.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
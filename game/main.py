@@ -1,13 +1,33 @@
 #! /usr/bin/env -vS python
 
+import time
+STARTUP_ORIGIN: float = time.perf_counter()  # Before every other import, so the 'import' startup phase covers them.
 import config as cfg
 import entity as ent
 import sys
 import os.path
-from typing import TypedDict
+from typing import Callable, Iterator
 import pygame
 import random
-import resizer
+import itertools
+import inputsource
+import entitystore
+import staticlayer
+import dirtyrects
+import profiler
+import timestep
+import phases
+import replay
+import atlas
+import variants
+import camera
+import propspray
+import renderqueue
+import collisions
+import assets
+import surfcache
+import streamloader
+import scheduler
 
 
 # ###########################################    GLOBAL INITIALIZATION    ##############################################
@@ -15,40 +35,141 @@ import resizer
 # SURFACE CACHE - 'SCACHE'
 # The Surface Cache SCACHE pre-loads images into surfaces. When sprites are instantiated, they will use this cache
 # for surfaces and not need to load them from disk. This is important for dynamically/frequently spawned/destroyed sprites.
-SurfCacheItem = TypedDict('SurfCacheItem',
-    {
-        'surface_l': pygame.Surface,  # Image as loaded and with 'flip' options and/or 'resize' options applied if True. Should be LEFT facing.
-        'surface_r': pygame.Surface,  # Flipped (assumed to be RIGHT-facing) version of image. Generated by load_image()
-    }
-)  # SurfCacheitem
-SCACHE: dict[str, SurfCacheItem] = {}  # The Surface Cache. Key = filename, Value = SurfCacheItem.
+# Keyed by the full ImageKey. Each variant is loaded once, on first use (via load_image(), defined further below) or
+# by the parallel preload. Optional byte budget with LRU eviction. See surfcache.py.
+SCACHE: surfcache.SurfaceCache = surfcache.SurfaceCache(
+        loader=lambda key: load_image(key),
+        budget_bytes=cfg.SCACHE_BUDGET_BYTES,
+    )
+
+# ENTITY STORE - 'ESTORE'
+# Opt-in structure-of-arrays home for Npc, Weapon and Prop motion. When enabled, these sprites are moved, bounced,
+# finalized and have their left/right image chosen by a few NumPy operations per frame instead of one Python
+# update() each. The Player stays on the regular per-sprite path because it is driven by input. See entitystore.py.
+# With SHARD_WORKERS, the arrays are in shared memory and worker processes do the moving. See shardsim.py.
+ESTORE: entitystore.EntityStore | None = None  # Created by build_world() when cfg.ENTITY_STORE_ENABLE.
+
+# SPRITE VARIANTS - Rotated/scaled images, rendered once per (image, heading bucket, scale bucket) on first use.
+VARIANTS: variants.VariantCache | None = None
+if cfg.SPRITE_VARIANTS_ENABLE:
+    VARIANTS = variants.VariantCache(
+            angle_steps=cfg.SPRITE_VARIANT_ANGLE_STEPS,
+            scale_step=cfg.SPRITE_VARIANT_SCALE_STEP,
+            budget_bytes=cfg.SPRITE_VARIANT_BUDGET_BYTES,
+        )
+
+# ASSET BUNDLE - 'BUNDLE'
+# Optional memory-mapped bundle of pre-processed (decoded, resized, flipped) pixels. When present, load_image() builds
+# SCACHE surfaces straight from it. It is opened (and rebuilt if stale) right after the display is initialized.
+BUNDLE: assets.AssetBundle | None = None
+
+# STREAMING LOADER - 'STREAMER'
+# Decodes images on background threads, in priority order (player and weapons first, background last), while the
+# loading screen and then the game run. Sprites whose image has not arrived yet show a placeholder until it does. Created
+# by preload_assets() when cfg.STREAMING_ENABLE. None means images are loaded up front (or on first use.)
+STREAMER: streamloader.StreamingLoader | None = None
+PLACEHOLDERS: dict[tuple[int, int], surfcache.SurfCacheItem] = {}  # One placeholder item per size.
+g_background: pygame.Surface | None = None  # The streamed background, once it arrived. Swapped in by run().
+
+# WEAPON POOL - 'WPOOL'
+# Preallocated, reusable Weapons for projectiles and meatballs. Created once the weapon images are cached (it needs a
+# surface to build the inactive Weapons.) None means plain one-shot Weapons are built for each spawn. See WeaponPool.
+WPOOL: 'WeaponPool | None' = None
+
+# INPUT - The one input source polled per frame. The Player reads keys from it. Swapped for scripted input by bench.py,
+# wrapped by a replay.Recorder when recording, or replaced by a replay.Replayer when replaying. See main().
+INPUT: inputsource.LiveInput | inputsource.ScriptedInput | replay.Recorder | replay.Replayer = inputsource.LiveInput()
+
+# SIMULATED TIME - Milliseconds of simulation (the sum of all frame delta times.) Used for cooldowns instead of
+# pygame.time.get_ticks(), so that fixed-timestep headless runs behave the same no matter how fast they run.
+g_sim_time_ms: float = 0.0
+
+# SCHEDULER - 'SCHED'
+# All timed behaviour (Player cooldowns, meatball spawning) as timers on simulated time, advanced once per simulation
+# step by the main loop. Only due timers cost anything. See scheduler.py.
+SCHED: scheduler.Scheduler = scheduler.Scheduler()
+
+# ENVIRONMENT PHASE ENGINE - Applies phase-dependent values (speed) to entities in bulk, only when the phase changes.
+PHASES: phases.PhaseEngine = phases.PhaseEngine(cfg.ENVIRO_PHASES)
+MEATBALL_PHASE_TABLE: phases.PhaseTable = ()  # Compiled by build_world(), once the responses are registered.
+
+# TEXTURE ATLAS - All SCACHE surfaces packed into a few pages. Created by run(). Repacked when SCACHE changes.
+ATLAS: atlas.TextureAtlas | None = None
+
+# CAMERA - The view onto a world that may be bigger than the screen. Created by run() when cfg.CAMERA_ENABLE.
+CAMERA: camera.Camera | None = None
+
+# PROP BATCHES - The sprayed props, as compact position arrays per prop template. Generated by build_world().
+PROP_BATCHES: list[propspray.PropBatch] = []
+
+# RENDER QUEUE - All sprite groups drawn with one fblits() call per frame. Created by run() when cfg.RENDER_QUEUE_ENABLE.
+RQUEUE: renderqueue.RenderQueue | None = None
+
+# STARTUP TIMER - Time-to-first-frame per startup phase: import, config, display, asset preload, world build, loop
+# setup and the first frame. Each phase function marks its own end. Printed at the first frame with cfg.STARTUP_REPORT.
+STARTUP: profiler.StartupTimer = profiler.StartupTimer(STARTUP_ORIGIN)
+
+# FRAME PROFILER - Created by run(). A NullProfiler unless cfg.PROFILER_ENABLE.
+PROF: profiler.FrameProfiler | profiler.NullProfiler = profiler.NullProfiler()
+
+# DISPLAY SURFACE (SCREEN / WINDOW) - Created by init_display().
+display_surface: pygame.Surface | None = None
+
+# CREATE SPRITE GROUPS
+all_sprites: pygame.sprite.Group = pygame.sprite.Group()
+all_players: pygame.sprite.Group = pygame.sprite.Group()
+all_weapons: pygame.sprite.Group = pygame.sprite.Group()
+all_npcs: pygame.sprite.Group = pygame.sprite.Group()
+all_props: pygame.sprite.Group = staticlayer.StaticPropGroup() if cfg.STATIC_PROP_LAYER else pygame.sprite.Group()
 
 
 # #############################################    CLASS DEFINITIONS    ################################################
 
+# NOTE: Every instance attribute of the Entity classes is declared in __slots__, so it lives in a fixed slot of the
+# instance and no per-instance __dict__ is ever created. Sprite itself has no __slots__, so its own (name-mangled)
+# attributes are declared here too. Without them, Sprite.__init__ would still create a __dict__ for just those three,
+# and since CPython 3.13 keeps the attributes of a class WITHOUT __slots__ inline in the object already, that dict alone
+# would make a slotted Entity BIGGER than an unslotted one. A new attribute missing from __slots__ still works, but
+# brings the __dict__ back. See membench.py.
+
 class Entity(pygame.sprite.Sprite):
-    base_instance_count: int = 0
+    __slots__ = ('_Sprite__g', '_Sprite__image', '_Sprite__rect',  # Sprite's groups, image and rect.
+                 'base_instance_id', 'instance_id', 'img_key', 'placeholder', 'surface_l', 'surface_r',
+                 'x', 'y', 'dir', 'speed', 'store_index', 'phase_table', 'heading_bucket', 'scale')
+    # Serial numbers. Counters, not ints: rebinding a class attribute per instance invalidates the class (and its
+    # subclasses) for attribute specialization, and after ~1000 rebinds CPython stops re-enabling it for good.
+    base_instance_ids: Iterator[int] = itertools.count()
+    stream_priority: int = streamloader.PRIORITY_LAST  # Loading order of the image when streamed in. See STREAMER.
     def __init__(self,
                 groups,
-                img_filename: str,
+                img_key: assets.ImageKey,
                 x: float,
                 y: float,
-                direction: pygame.math.Vector2,
+                direction: pygame.math.Vector2 | tuple[float, float],
                 speed: float,
             ):
-        self.base_instance_id: int = Entity.base_instance_count
-        self.surface_l: pygame.Surface = SCACHE[img_filename]['surface_l']
-        self.surface_r: pygame.Surface = SCACHE[img_filename]['surface_r']
+        self.base_instance_id: int = next(Entity.base_instance_ids)
+        self.img_key: assets.ImageKey = img_key
+        c_item: surfcache.SurfCacheItem
+        c_item, self.placeholder = sprite_images(img_key, self)  # placeholder: True while the image streams in.
+        self.surface_l: pygame.Surface = c_item['surface_l']
+        self.surface_r: pygame.Surface = c_item['surface_r']
         self.x: float = x
         self.y: float = y
-        self.dir: pygame.math.Vector2 = direction  # Direction
+        self.dir: pygame.math.Vector2 = pygame.math.Vector2(direction)  # Direction. Our own copy.
         self.speed: float = speed  # Speed
-        self.image: pygame.Surface = pygame.Surface((0, 0))  # Active image (depending on direction of motion)
-        self.rect: pygame.FRect = pygame.FRect()
+        self.store_index: int = -1  # Slot in ESTORE. -1 means not registered (or the store is disabled.)
+        self.phase_table: phases.PhaseTable = ()  # Set by PHASES.register(). Empty means phases do not affect it.
+        self.heading_bucket: int = -1  # Sprite variant heading bucket of the current image. -1 = plain left/right image.
+        self.scale: float = 1.0  # Sprite variant scale. (Nothing zooms yet.)
         super().__init__(groups)  # super.update() could be done first before setting all the self.* but for now I have them last.
-        Entity.base_instance_count += 1
 
-        self.rect = self.surface_l.get_frect(center=(self.x, self.y))
+        # NOTE: image and rect must be set AFTER Sprite.__init__(), which resets both to None.
+        # Active image (depending on direction of motion). Same rule as update(), so no placeholder surface is needed.
+        self.image: pygame.Surface = self.surface_l if self.dir.x < 0 else self.surface_r
+        self.rect: pygame.FRect = self.surface_l.get_frect(center=(self.x, self.y))
+        if VARIANTS is not None and self.dir:
+            self.apply_heading(VARIANTS.angle_bucket(self.dir.x, self.dir.y))
 
     def update(self, delta_time: float, ephase_name: str):
         # NOTE: ephase_name ARG had to be added to places it is not actually used. (* PyCharm static analysis warning *)
@@ -62,8 +183,11 @@ class Entity(pygame.sprite.Sprite):
 
         self.physics_outer_walls()  # Handle bouncing off walls. NOTE: Props override this and pass. Props ignore walls.
 
-        # Activate the correctly-facing image, based on X direction.
-        if self.dir.x < 0:
+        # Activate the correctly-facing image, based on X direction. (Or on the full heading, with sprite variants.)
+        if VARIANTS is not None:
+            if self.dir:  # Not moving keeps the last heading.
+                self.apply_heading(VARIANTS.angle_bucket(self.dir.x, self.dir.y))
+        elif self.dir.x < 0:
             self.image = self.surface_l
         else:
             self.image = self.surface_r
@@ -75,8 +199,8 @@ class Entity(pygame.sprite.Sprite):
             self.dir.x *= -1
 
         # Bounce off RIGHT wall in X Axis
-        if self.rect.right >= cfg.SCREEN_WIDTH:
-            self.rect.right = cfg.SCREEN_WIDTH
+        if self.rect.right >= cfg.WORLD_WIDTH:
+            self.rect.right = cfg.WORLD_WIDTH
             self.dir.x *= -1
 
         # Bounce off TOP wall in Y Axis
@@ -85,44 +209,83 @@ class Entity(pygame.sprite.Sprite):
             self.dir.y *= -1
 
         # Bounce off BOTTOM wall in Y Axis
-        if self.rect.bottom >= cfg.SCREEN_HEIGHT:
-            self.rect.bottom = cfg.SCREEN_HEIGHT
+        if self.rect.bottom >= cfg.WORLD_HEIGHT:
+            self.rect.bottom = cfg.WORLD_HEIGHT
             self.dir.y *= -1
 
-    def
+    # Switches to the sprite variant for a heading bucket. Only does any work when the bucket actually changed. The rect
+    # is resized (rotated images are bigger) around the same center.
+    def apply_heading(self, bucket: int):
+        if bucket == self.heading_bucket or self.placeholder:  # (Placeholders are never rotated into the cache.)
+            return
+        self.heading_bucket = bucket
+        self.image = VARIANTS.get(self.img_key, bucket, VARIANTS.scale_bucket(self.scale), self.surface_l,
+                                  self.surface_r)
+        self.fit_rect()
+
+    # Resizes the rect to the current image, around the same center. (And the EntityStore extents with it.)
+    def fit_rect(self):
+        center = self.rect.center
+        self.rect.size = self.image.get_size()
+        self.rect.center = center
+        if self.store_index >= 0:
+            ESTORE.half_w[self.store_index] = self.rect.width / 2
+            ESTORE.half_h[self.store_index] = self.rect.height / 2
+
+    # Swaps the placeholder for the real images, once they have streamed in. See stream_assets().
+    def set_images(self, c_item: surfcache.SurfCacheItem):
+        self.placeholder = False
+        self.surface_l = c_item['surface_l']
+        self.surface_r = c_item['surface_r']
+        self.image = self.surface_l if self.dir.x < 0 else self.surface_r
+        self.fit_rect()
+        if VARIANTS is not None:
+            self.heading_bucket = -1
+            if self.dir:
+                self.apply_heading(VARIANTS.angle_bucket(self.dir.x, self.dir.y))
+
+    # Changes direction from outside of update() (e.g. a collision response), keeping the EntityStore in step.
+    def set_direction(self, x: float, y: float):
+        self.dir.update(x, y)
+        if self.store_index >= 0:
+            ESTORE.set_motion(self, x, y, self.speed)
+
+    def kill(self):  # Overrides Sprite.kill() so a sprite registered in the EntityStore gives up its array slot too.
+        if self.store_index >= 0:
+            ESTORE.remove(self)
+        if self.phase_table:
+            PHASES.unregister(self)
+        super().kill()
+
 
 class Player(Entity):
-    instance_count: int = 0
+    __slots__ = ('weapon_spec', 'weapon_phase_table', 'all_weapons_group_ref', 'can_shoot', 'cooldown_duration')
+    instance_ids: Iterator[int] = itertools.count()
+    stream_priority: int = streamloader.PRIORITY_PLAYER
     def __init__(self,
                 groups,
-                img_filename: str,
-                weapon_spec: ent.WeaponSpec,
+                img_key: assets.ImageKey,
+                weapon_spec: ent.SpecRecord,
                 all_weapons_group_ref: pygame.sprite.Group,
                 x: float,
                 y: float,
-                direction: pygame.math.Vector2,
+                direction: pygame.math.Vector2 | tuple[float, float],
                 speed: float,
             ):
-        self.instance_id: int = Player.instance_count
-        self.weapon_spec = weapon_spec
+        self.instance_id: int = next(Player.instance_ids)
+        self.weapon_spec: ent.SpecRecord = weapon_spec
+        self.weapon_phase_table: phases.PhaseTable = PHASES.compile(weapon_spec)
         self.all_weapons_group_ref = all_weapons_group_ref  # TODO: On the fence about keeping this. Should minimize global usage though, so this might be good.
         self.can_shoot: bool = True
-        self.laser_shoot_time: int = 0
         self.cooldown_duration: int = cfg.LASER_COOLDOWN_DURATION  # milliseconds
-        super().__init__(groups, img_filename, x, y, direction, speed)  # super.update() could be done first before setting all the self.* but for now I have them last.
-        Player.instance_count += 1
+        super().__init__(groups, img_key, x, y, direction, speed)  # super.update() could be done first before setting all the self.* but for now I have them last.
 
-    def laser_timer(self):
-        if not self.can_shoot:
-            current_time = pygame.time.get_ticks()  # Milliseconds since pygame.init() was called.
-            if current_time - self.laser_shoot_time >= self.cooldown_duration:
-                self.can_shoot = True
+    def rearm(self):  # Called by SCHED once the cooldown after a shot is over.
+        self.can_shoot = True
 
     def update(self, delta_time: float, ephase_name: str):
-        enviro_influence(self, ephase_name)
-
-        keys = pygame.key.get_pressed()
-        recent_keys = pygame.key.get_just_pressed()
+        keys = INPUT.pressed  # Polled once per frame by the main loop. (Live keyboard, or a script when headless.)
+        recent_keys = INPUT.just_pressed
 
         self.dir.x = int(keys[pygame.K_RIGHT]) - int(keys[pygame.K_LEFT])
         self.dir.y = int(keys[pygame.K_DOWN]) - int(keys[pygame.K_UP])
@@ -131,83 +294,191 @@ class Player(Entity):
 
         if recent_keys[pygame.K_SPACE] and self.can_shoot:
             self.can_shoot = False
-            self.laser_shoot_time = pygame.time.get_ticks()
-            weapon_img_filename = self.weapon_spec['img_filename']
-            projectile: Weapon = Weapon(
+            SCHED.after(self.cooldown_duration, self.rearm)
+            projectile: Weapon | None = spawn_weapon(
                     groups=[all_sprites, self.all_weapons_group_ref],
-                    img_filename=weapon_img_filename,
+                    img_key=self.weapon_spec.img_key,
                     x=self.rect.midtop[0],
                     y=self.rect.midtop[1],
-                    direction=self.weapon_spec['d'],
-                    speed=self.weapon_spec['s'],
+                    direction=self.weapon_spec.d,
+                    speed=self.weapon_spec.s,
+                    phase_table=self.weapon_phase_table,
                 )  # PyCharm FALSE WARNING HERE (AbstractGroup)
-        self.laser_timer()
         # NOTE: WE UPDATE BASED ON INPUT --BEFORE-- WE CHECK FOR WALL COLLISION/BOUNCING (in super/Entity).
         super().update(delta_time, ephase_name)
 
 
 class Weapon(Entity):
-    instance_count: int = 0
+    __slots__ = ('pool', 'activations')
+    instance_ids: Iterator[int] = itertools.count()
+    stream_priority: int = streamloader.PRIORITY_WEAPON
     def __init__(self,
                 groups,
-                img_filename: str,
+                img_key: assets.ImageKey,
                 x: float,
                 y: float,
-                direction: pygame.math.Vector2,
+                direction: pygame.math.Vector2 | tuple[float, float],
                 speed: float,
+                pool: 'WeaponPool | None' = None,
             ):
-        self.instance_id: int = Weapon.instance_count
-        super().__init__(groups, img_filename, x, y, direction, speed)  # super.update() could be done first before setting all the self.* but for now I have them last.
-        Weapon.instance_count += 1
-
-    def update(self, delta_time: float, ephase_name: str):
-        enviro_influence(self, ephase_name)
-        super().update(delta_time, ephase_name)
+        self.instance_id: int = next(Weapon.instance_ids)
+        self.pool = pool  # The WeaponPool this Weapon returns to when it is killed. None for a plain one-shot Weapon.
+        self.activations: int = 0  # Times this (pooled) Weapon has been activated.
+        super().__init__(groups, img_key, x, y, direction, speed)  # super.update() could be done first before setting all the self.* but for now I have them last.
+        if ESTORE is not None and self.alive():  # Pooled Weapons are built outside of any group and register on activate.
+            ESTORE.add(self, entitystore.WALLS_PROJECTILE)
+
+    # Re-initializes a pooled (inactive) Weapon in place: no new Sprite, FRect, Vector2 or Surface is created.
+    def activate(self,
+                groups,
+                img_key: assets.ImageKey,
+                x: float,
+                y: float,
+                direction: pygame.math.Vector2 | tuple[float, float],
+                speed: float,
+            ):
+        c_item: surfcache.SurfCacheItem
+        c_item, self.placeholder = sprite_images(img_key, self)
+        self.img_key = img_key
+        self.surface_l = c_item['surface_l']
+        self.surface_r = c_item['surface_r']
+        self.x = x
+        self.y = y
+        self.dir.update(direction)  # Copy into our own Vector2. (Pooled Weapons never share the spec's Vector2.)
+        self.speed = speed
+        self.image = self.surface_l if self.dir.x < 0 else self.surface_r
+        self.rect.size = self.surface_l.get_size()
+        self.rect.center = (x, y)
+        self.heading_bucket = -1
+        if VARIANTS is not None and self.dir:
+            self.apply_heading(VARIANTS.angle_bucket(self.dir.x, self.dir.y))
+        self.add(groups)
+        self.activations += 1
+        if ESTORE is not None:
+            ESTORE.add(self, entitystore.WALLS_PROJECTILE)
+
+    def kill(self):  # Overrides Entity.kill(). A pooled Weapon is deactivated and handed back, not thrown away.
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
 
     def physics_outer_walls(self):  # Overrides Entity.physics_outer_walls().
         # Projectiles/weapons are deleted beyond some margin and do not bounce off the outer walls.
         if self.rect.left <= 0 - cfg.PROJECTILE_MARGIN:  # A little beyond LEFT wall in X Axis
             self.kill()
-        if self.rect.right >= cfg.SCREEN_WIDTH + cfg.PROJECTILE_MARGIN:  # A little beyond RIGHT wall in X Axis
+        if self.rect.right >= cfg.WORLD_WIDTH + cfg.PROJECTILE_MARGIN:  # A little beyond RIGHT wall in X Axis
             self.kill()
         if self.rect.top <= 0 - cfg.PROJECTILE_MARGIN:  # A little beyond TOP wall in Y Axis
             self.kill()
-        if self.rect.bottom >= cfg.SCREEN_HEIGHT + cfg.PROJECTILE_MARGIN:  # A little beyond BOTTOM wall in Y Axis
+        if self.rect.bottom >= cfg.WORLD_HEIGHT + cfg.PROJECTILE_MARGIN:  # A little beyond BOTTOM wall in Y Axis
             self.kill()
 
 
+# WEAPON POOL - Preallocated Weapons that are activated, moved and deactivated without being rebuilt. Each Space press
+# and each meatball would otherwise build a fresh Weapon (Sprite, FRect, Vector2...) only to kill() it a moment later,
+# and that allocation churn shows up as GC pauses under chaos-phase spawn rates.
+# When all pooled Weapons are live, the 'when_exhausted' policy decides: 'grow' builds another one (the pool gets
+# bigger), 'drop' refuses the spawn (acquire returns None) and 'recycle' kills the oldest live Weapon and reuses it.
+class WeaponPool:
+    def __init__(self, capacity: int, when_exhausted: str, img_key: assets.ImageKey):
+        if when_exhausted not in ('grow', 'drop', 'recycle'):
+            raise ValueError(f"FATAL: Invalid when_exhausted '{when_exhausted}'. "
+                             "Check WEAPON_POOL_EXHAUSTED in config.")
+        self.capacity: int = capacity
+        self.when_exhausted: str = when_exhausted
+        self.img_key: assets.ImageKey = img_key  # Any cached image. Only used to build the inactive Weapons.
+        self.free: list[Weapon] = [self._build() for _ in range(capacity)]
+        self.live: dict[Weapon, bool] = {}  # Insertion-ordered, so the first key is the oldest live Weapon.
+        self.acquired: int = 0  # Successful acquire() calls.
+        self.reused: int = 0  # acquire() calls served by a previously used Weapon.
+        self.built: int = capacity  # Weapons ever constructed, including the preallocated ones.
+        self.dropped: int = 0  # Spawns refused under the 'drop' policy.
+        self.recycled: int = 0  # Live Weapons cut short under the 'recycle' policy.
+        self.peak_live: int = 0
+
+    def _build(self) -> Weapon:
+        return Weapon(groups=[], img_key=self.img_key, x=0.0, y=0.0, direction=(0.0, 0.0), speed=0.0,
+                      pool=self)
+
+    def acquire(self,
+                groups,
+                img_key: assets.ImageKey,
+                x: float,
+                y: float,
+                direction: pygame.math.Vector2 | tuple[float, float],
+                speed: float,
+            ) -> Weapon | None:
+        if not self.free:
+            if self.when_exhausted == 'grow':
+                self.free.append(self._build())
+                self.built += 1
+                self.capacity += 1
+            elif self.when_exhausted == 'recycle':
+                next(iter(self.live)).kill()  # Back into self.free.
+                self.recycled += 1
+            else:  # 'drop'
+                self.dropped += 1
+                return None
+        weapon = self.free.pop()
+        if weapon.activations:
+            self.reused += 1
+        weapon.activate(groups, img_key, x, y, direction, speed)
+        self.live[weapon] = True
+        self.acquired += 1
+        self.peak_live = max(self.peak_live, len(self.live))
+        return weapon
+
+    def release(self, weapon: Weapon) -> None:
+        if self.live.pop(weapon, False):  # Guards against double kills (e.g. two walls crossed in the same frame.)
+            self.free.append(weapon)
+
+    def stats(self) -> dict:
+        return {
+            'capacity': self.capacity,
+            'live': len(self.live),
+            'peak_live': self.peak_live,
+            'acquired': self.acquired,
+            'built': self.built,
+            'reuse_rate': self.reused / self.acquired if self.acquired else 0.0,
+            'dropped': self.dropped,
+            'recycled': self.recycled,
+        }
+
+
 class Npc(Entity):
-    instance_count: int = 0
+    __slots__ = ()
+    instance_ids: Iterator[int] = itertools.count()
+    stream_priority: int = streamloader.PRIORITY_NPC
     def __init__(self,
                 groups,
-                img_filename: str,
+                img_key: assets.ImageKey,
                 x: float,
                 y: float,
-                direction: pygame.math.Vector2,
+                direction: pygame.math.Vector2 | tuple[float, float],
                 speed: float,
             ):
-        self.instance_id: int = Npc.instance_count
-        super().__init__(groups, img_filename, x, y, direction, speed)  # super.update() can be done before or after setting any self.* but think about how it might matter! Maybe not at all.
-        Npc.instance_count += 1
-
-    def update(self, delta_time: float, ephase_name: str):
-        enviro_influence(self, ephase_name)
-        super().update(delta_time, ephase_name)
+        self.instance_id: int = next(Npc.instance_ids)
+        super().__init__(groups, img_key, x, y, direction, speed)  # super.update() can be done before or after setting any self.* but think about how it might matter! Maybe not at all.
+        if ESTORE is not None:
+            ESTORE.add(self, entitystore.WALLS_BOUNCE)
 
 
 class Prop(Entity):
-    instance_count: int = 0
+    __slots__ = ()
+    instance_ids: Iterator[int] = itertools.count()
+    stream_priority: int = streamloader.PRIORITY_PROP
     def __init__(self,
                 groups,
-                img_filename: str,
+                img_key: assets.ImageKey,
                 x: float,
                 y: float,
             ):
-        self.instance_id: int = Prop.instance_count
-        prop_zero_direction: pygame.math.Vector2 = pygame.math.Vector2(0, 0)  # Props special case direction, to init Entity.
+        self.instance_id: int = next(Prop.instance_ids)
+        prop_zero_direction: tuple[float, float] = (0.0, 0.0)  # Props special case direction, to init Entity.
         prop_zero_speed: float = 0.0  # Props special case speed, to init Entity.
-        super().__init__(groups, img_filename, x, y, prop_zero_direction, prop_zero_speed)  # super.update() can be done before or after setting any self.* but think about how it might matter! Maybe not at all.
-        Prop.instance_count += 1
+        super().__init__(groups, img_key, x, y, prop_zero_direction, prop_zero_speed)  # super.update() can be done before or after setting any self.* but think about how it might matter! Maybe not at all.
+        if ESTORE is not None and not cfg.STATIC_PROP_LAYER:  # Baked props are never updated, so they need no slot.
+            ESTORE.add(self, entitystore.WALLS_NONE)
 
     def update(self, delta_time: float, ephase_name: str):
         super().update(delta_time, ephase_name)
@@ -218,319 +489,696 @@ class Prop(Entity):
 
 # #############################################    FUNCTION DEFINITIONS    #############################################
 
-# NOTE: Disabling enviro_influence temporarily for many reasons:
-# 1. I have removed spec from instances and this was where new enviro speeds are stored. I need to pass another way now.
-# 2. I want to generalize so I need a tiny macro language to instruct enviro response changes to ANY ATTRIBUTE.
-# 3. This macro system needs to be super simple and process efficiently OR just pass a simpler dict than spec.
-# 4. Or use callbacks to little functions which implement the enviro responses.
-# 5. When this is figured out I will re-enable the new form. None of this is in the tutorial anyhow.
-# *** MyPy ERROR about PropSpec dict has no keys for p,r,c,f - BUT PropSpec WILL **NEVER** BE PASSED HERE !!! ???
-def enviro_influence(xself: Player | Weapon | Npc, ephase_name: str) -> None:
-    pass  # TEMPORARILY DISABLED PER THE ABOVE REASONS.
-    # # ENVIRO PHASES - APPLICATION OF INFLUENCE OF CURRENT PHASE
-    # if ephase_name == 'peace':
-    #     xself.speed = xself.spec['p']
-    # elif ephase_name == 'rogue':
-    #     xself.speed = xself.spec['r']
-    # elif ephase_name == 'chaos':
-    #     xself.speed = xself.spec['c']
-    # elif ephase_name == 'frozen':
-    #     xself.speed = xself.spec['f']
-    # else:
-    #     raise ValueError(f"FATAL: Invalid ephase_name '{ephase_name}'. "
-    #                      "Check values in ENVIRO_PHASES config.")
-
-def load_image(
-            filename: str,
-            flip: bool,
-            resize: bool,
-            width: int | None,
-            height: int | None,
-        ) -> None:
-    image_path = os.path.join(cfg.ASSET_PATH, filename)
-    surface_l: pygame.Surface = pygame.Surface((0, 0))
-    if resize:
-        if width and height:
-            with open(image_path, 'rb') as fh:
-                img_bytes = fh.read()
-            resized_png_bytes = resizer.alphonic_resize(
-                    img_data=img_bytes,
-                    width=width,
-                    height=height,
-                )
-            # Output of this file was originally for validation, and now it is a workaround until frombytes() works.
-            with open('load-image-temp-out-png.png', 'wb') as fh:
-                fh.write(resized_png_bytes)
-            # This image data is good! Proves problem is with pygame.image.frombytes()  (And then workaround was done.)
-            new_size = (width, height)  # NOTE: This is the size of the already-resized image. No resizing occurs here.
-            if cfg.PYGAME_FROMBYTES_IMAGE_LOAD_WORKAROUND_ENABLE:  # A BAD BUT VERY TEMPORARY HACK (which works great)
-                # Obviously the following can have race conditions and is a very hackish hack and NOT a solution.
-                filesystem_loaded_resized_surface_hack = pygame.image.load(
-                    'load-image-temp-out-png.png'
-                ).convert_alpha()
-                surface_l = filesystem_loaded_resized_surface_hack  # For clarity
-            else:
-                alphonically_resized_surface = pygame.image.frombytes(
-                        resized_png_bytes,
-                        size=new_size,
-                        format='RGBA',
-                    ).convert_alpha()
-                # ******************************************************************
-                # PERSISTENT ERROR:
-                #     fbtest = pygame.image.frombytes(img_bytes, size=(140, 140), format='RGBA').convert_alpha()
-                #              ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
-                # ValueError: Bytes length does not equal format and resolution size
-                # ******************************************************************
-                surface_l = alphonically_resized_surface
-    else:
-        surface_l: pygame.Surface = pygame.image.load(image_path).convert_alpha()
+# ENVIRO PHASES - The 'speed' response setter for PHASES. Called once per bucket of same-spec entities, only when the
+# phase changes. Entities in ESTORE get their store speeds set in one NumPy assignment as well.
+# (This replaces enviro_influence(), which picked each entity's speed by phase name every frame.)
+def set_speeds(entities, speed: float) -> None:
+    for entity in entities:
+        entity.speed = speed
+    if ESTORE is not None:
+        ESTORE.set_speeds(entities, speed)
+
+
+# The SCACHE loader. Produces a finished SurfCacheItem for the key, from the bundle if it has it, otherwise by decoding
+# (and resizing) on this thread. preload_images() does the same decoding work up front, on a worker pool.
+def load_image(key: assets.ImageKey) -> surfcache.SurfCacheItem:
+    if BUNDLE is not None:
+        bundled = BUNDLE.surfaces(key)
+        if bundled is not None:  # Ready-to-blit pixels straight from the memory-mapped bundle. No decode/resize/flip.
+            return {'surface_l': bundled[0], 'surface_r': bundled[1]}
+    return finish_image(key, assets.decode_surface(key))
 
-    if flip:
+
+# The main-thread half of loading an image: conversion to the display format and the flips. Everything before this
+# (file I/O, decoding, resizing) is display-independent and done by assets.decode_surface(), possibly on a worker.
+def finish_image(key: assets.ImageKey, raw_surface: pygame.Surface) -> surfcache.SurfCacheItem:
+    surface_l: pygame.Surface = raw_surface.convert_alpha()
+
+    if key[1]:  # flip
         surface_l = pygame.transform.flip(surface_l, True, False)
 
     # Create RIGHT-facing surface:
     surface_r: pygame.Surface = pygame.transform.flip(surface_l, True, False)
 
-    # print(filename)
-    # print(surface_l)
-    # print(surface_r)
-    # ADD CACHE ITEM:
-    c_item: SurfCacheItem = {
+    c_item: surfcache.SurfCacheItem = {
             'surface_l': surface_l,
             'surface_r': surface_r,
         }
-    SCACHE[filename] = c_item
+    return c_item
+
+
+# A translucent box of the image's size, shown until the image has streamed in. Images without a size (w/h of 0) get a
+# small one, and the sprite is resized when the real image arrives.
+def placeholder_item(key: assets.ImageKey) -> surfcache.SurfCacheItem:
+    size = (key[3] or cfg.STREAM_PLACEHOLDER_SIZE, key[4] or cfg.STREAM_PLACEHOLDER_SIZE)
+    c_item = PLACEHOLDERS.get(size)
+    if c_item is None:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface.fill(cfg.STREAM_PLACEHOLDER_COLOR)
+        c_item = PLACEHOLDERS[size] = {'surface_l': surface, 'surface_r': surface}
+    return c_item
+
+
+# The images for a sprite, and whether they are only a placeholder. Without streaming (or when the image is cached or
+# bundled) this is simply SCACHE.get(). Otherwise the image is requested at the sprite's priority and the sprite waits
+# for it. See stream_assets().
+def sprite_images(key: assets.ImageKey, sprite: Entity) -> tuple[surfcache.SurfCacheItem, bool]:
+    if STREAMER is None or key in SCACHE or (BUNDLE is not None and key in BUNDLE.entries):
+        return SCACHE.get(key), False
+    STREAMER.request(key, sprite.stream_priority)
+    STREAMER.wait(key, sprite)
+    return placeholder_item(key), True
+
+
+# Finishes streamed images on the main thread, for up to budget_seconds: into SCACHE (or g_background), then onto the
+# sprites waiting for them. Returns True if any Prop changed images, since the props are baked/composited/hashed once.
+def stream_assets(budget_seconds: float) -> bool:
+    global g_background
+    props_changed = False
+    for key, raw_surface in STREAMER.poll(budget_seconds):
+        if key == assets.BACKGROUND_KEY:
+            g_background = raw_surface.convert()
+            continue
+        c_item = finish_image(key, raw_surface)
+        SCACHE.put(key, c_item)
+        for sprite in STREAMER.waiters.pop(key, ()):
+            if sprite.placeholder and sprite.img_key == key:  # (A pooled Weapon may have moved on to another image.)
+                sprite.set_images(c_item)
+                props_changed = props_changed or isinstance(sprite, Prop)
+    return props_changed
+
+
+# PRELOAD STAGE - Decodes and resizes every unique image variant the specs reference, concurrently on a thread pool.
+# Only convert_alpha() and the flips happen on the main thread, as each decoded result arrives. Results go straight into
+# SCACHE, so the sprites instantiated afterwards are all cache hits.
+def preload_images(keys: list[assets.ImageKey]) -> None:
+    keys = [key for key in keys if key not in SCACHE]
+    if BUNDLE is not None:
+        keys = [key for key in keys if key not in BUNDLE.entries]  # Bundled images need no decoding at all.
+    for key, raw_surface in assets.decode_surfaces_parallel(keys, cfg.PRELOAD_WORKERS):
+        SCACHE.put(key, finish_image(key, raw_surface))
+
+
+# COLLISION RESPONSES - Callbacks for CollisionSystem.on_pair(). Called once per overlapping pair per frame.
+def collide_weapon_npc(weapon: Weapon, npc: Npc) -> None:
+    weapon.kill()  # The projectile is used up. (NPCs are unharmed for now.)
+
+
+def collide_npc_npc(npc_a: Npc, npc_b: Npc) -> None:
+    # Swap directions (an equal-mass elastic bounce, roughly) but only while the two are still approaching each other.
+    # Otherwise a pair that overlaps for several frames would swap back and forth and stick together.
+    offset = pygame.math.Vector2(npc_b.rect.center) - pygame.math.Vector2(npc_a.rect.center)
+    if offset.dot(npc_a.dir - npc_b.dir) > 0:
+        a_dir = pygame.math.Vector2(npc_a.dir)
+        npc_a.set_direction(npc_b.dir.x, npc_b.dir.y)
+        npc_b.set_direction(a_dir.x, a_dir.y)
+
+
+# Group.draw() replacement that draws through the camera (culled, scrolled) and/or from the texture atlas when enabled.
+def draw_group(group: pygame.sprite.Group) -> None:
+    if CAMERA is not None:
+        CAMERA.draw(display_surface, group, ATLAS)
+    elif ATLAS is None:
+        group.draw(display_surface)
+    else:
+        ATLAS.draw(display_surface, group)
+
+
+# Like draw_group(), but into RQUEUE, to be drawn by its submit().
+def queue_group(group: pygame.sprite.Group) -> None:
+    if CAMERA is not None:
+        RQUEUE.push_sequence(CAMERA.blit_sequence(group, ATLAS), fast=ATLAS is None)
+    elif ATLAS is None:
+        RQUEUE.push(group)
+    else:
+        RQUEUE.push_sequence(ATLAS.blit_sequence(group))
+
+
+# (Re)packs the texture atlas from every surface currently in SCACHE.
+def pack_atlas() -> None:
+    surfaces = [surface for c_item in SCACHE.items.values() for surface in (c_item['surface_l'], c_item['surface_r'])]
+    ATLAS.pack(surfaces, SCACHE.generation)
+
+
+# All Weapon spawning goes through here, so the pool (when enabled) is used everywhere. Returns None if the pool
+# refused the spawn (the 'drop' policy.)
+def spawn_weapon(
+            groups,
+            img_key: assets.ImageKey,
+            x: float,
+            y: float,
+            direction: pygame.math.Vector2 | tuple[float, float],
+            speed: float,
+            phase_table: phases.PhaseTable = (),
+        ) -> Weapon | None:
+    if WPOOL is not None:
+        weapon = WPOOL.acquire(groups, img_key, x, y, direction, speed)
+    else:
+        weapon = Weapon(groups, img_key, x, y, direction, speed)
+    if weapon is not None and phase_table:
+        PHASES.register(weapon, phase_table)  # Takes on the current phase's speed right away.
+    return weapon
 
 
 def event_meatball(group_ref: pygame.sprite.Group):
-    meatball_spec = ent.weapon_specs[1]
-    spawn_x = random.randint((0 - cfg.MEATBALL_SPAWN_MARGIN), (cfg.SCREEN_WIDTH + cfg.MEATBALL_SPAWN_MARGIN))
+    meatball_spec = ent.weapon_records[1]
+    spawn_x = random.randint((0 - cfg.MEATBALL_SPAWN_MARGIN), (cfg.WORLD_WIDTH + cfg.MEATBALL_SPAWN_MARGIN))
     spawn_y = random.randint((0 - 2 * cfg.MEATBALL_SPAWN_MARGIN), ( 0 - cfg.MEATBALL_SPAWN_MARGIN))
     # print(f"Meatball spawning at : {spawn_x}, {spawn_y}")
-    projectile: Weapon = Weapon(
+    projectile: Weapon | None = spawn_weapon(
             groups=[all_sprites, group_ref],
-            img_filename=meatball_spec['img_filename'],
+            img_key=meatball_spec.img_key,
             x=spawn_x,
             y=spawn_y,
-            direction=pygame.math.Vector2((0.0, 1.0)),  # Down (Meatballs fall from the sky.)
-            speed=meatball_spec['s'],
+            direction=(0.0, 1.0),  # Down (Meatballs fall from the sky.)
+            speed=meatball_spec.s,
+            phase_table=MEATBALL_PHASE_TABLE,
         )  # PyCharm FALSE WARNING HERE (AbstractGroup)
 
 
 # ###############################################    INITIALIZATION    #################################################
 
-pygame.init()
-
-# INITIALIZE THE MAIN DISPLAY SURFACE (SCREEN / WINDOW)
-display_surface = pygame.display.set_mode((cfg.SCREEN_WIDTH, cfg.SCREEN_HEIGHT))
-pygame.display.set_caption(cfg.GAME_TITLE)
-
-# CREATE SPRITE GROUPS
-all_sprites: pygame.sprite.Group = pygame.sprite.Group()
-all_players: pygame.sprite.Group = pygame.sprite.Group()
-all_weapons: pygame.sprite.Group = pygame.sprite.Group()
-all_npcs: pygame.sprite.Group = pygame.sprite.Group()
-all_props: pygame.sprite.Group = pygame.sprite.Group()
-
-# GENERATE PROP SPECS - 'SPRAY' REPLICATED PROPS (randomly within specified radius, to specified count)
-# TODO: Rename this/related to generated_prop_specs or similar to make it clear that 1. it is generated and different
-#     from other such things. And 2. It is distinctly different from anything else named _specs (in this sense.)
-#     I think these are important clarifications. If it is called just prop_specs it looks like something from entity.py
-#     While it is related to entity.py most certainly, it is something different.
-#     These are the props we dynamically 'spray'. Likely there will be other modes of dynamic generation where we use
-#     templates (template specs) from entity.py to create spec objects, but which we will name by this convention.
-#     ADVICE: You should not change to many different things in a single cycle of change-test-commit-push etc.
-#     This is why I put the TO-DO here, because I am in the middle of many other changes. You need to isolate change
-#     strategically. It does not slow you down. It speeds you up, because one mistake can set you back that much
-#     and you also need the clarity of focus and thought to not carry too many tasks at once, lest the quality suffer.
-prop_specs = []
-for prop_t in ent.prop_templates:
-    for index in range(prop_t['spray_count']):  # We will use the index for a unique prop name. Not critical.
-        prop_spec: ent.PropSpec = {
-                'name': prop_t['name'] + str(index),  # Unique name of generated (sprayed) prop_spec. (Compared to npc_spec which are hardcoded.)
-                'instance_id': -1,  # -1 means instance not instantiated yet.
-                'img_filename': prop_t['img_filename'],  # Copy the unchanging attributes from the template before handling dynamic ones.
-                'flip': False,
-                'resize': False,
-                'w': prop_t['w'],
-                'h': prop_t['h'],
-                'color': prop_t['color'],
-                'x': 0.0,  # placeholder (mpypy)
-                'y': 0.0,  # placeholder (mpypy)
-                }
-
-        diameter = 2.0 * prop_t['spray_radius']  # This variable makes it easier to read/understand. Inline for perf.
-        prop_spec['name'] = prop_t['name'] + "-" + str(index)
-        x_offset = random.uniform(0.0, diameter) - prop_t['spray_radius']  # uniform() gives a random float value
-        y_offset = random.uniform(0.0, diameter) - prop_t['spray_radius']  # uniform() includes the limits
-        prop_spec['x'] = prop_t['x'] + x_offset
-        prop_spec['y'] = prop_t['y'] + y_offset
-
-        prop_specs.append(prop_spec)
+# Startup is split into explicit steps so that main.py can be imported (e.g. by bench.py) without opening a window or
+# running the interactive loop: init_display(), then build_world(), then run(). main() does all three for a normal game.
+
+def init_display() -> None:
+    global display_surface
+    pygame.init()
+
+    # INITIALIZE THE MAIN DISPLAY SURFACE (SCREEN / WINDOW)
+    display_surface = pygame.display.set_mode((cfg.SCREEN_WIDTH, cfg.SCREEN_HEIGHT))
+    pygame.display.set_caption(cfg.GAME_TITLE)
+    STARTUP.mark('display')
+
+
+# ASSET PRELOAD PHASE - Needs the display (for convert_alpha.) Everything here is optional: images that are neither
+# bundled nor preloaded are simply loaded by SCACHE on first use, during the world build.
+def preload_assets() -> None:
+    global BUNDLE, STREAMER
+    # OPEN THE ASSET BUNDLE (Rebuilt automatically first, if any source asset or spec changed since it was built.)
+    if cfg.ASSET_BUNDLE_ENABLE:
+        BUNDLE = assets.open_bundle(cfg.ASSET_BUNDLE_PATH, assets.bundle_keys())
+
+    # STREAMING - Everything is requested now, by priority, and keeps loading in the background once the game runs.
+    #     Only the images up to cfg.STREAM_BLOCKING_PRIORITY are waited for, behind the loading screen.
+    if cfg.STREAMING_ENABLE:
+        STREAMER = streamloader.StreamingLoader(assets.decode_surface, cfg.STREAM_WORKERS)
+        stream_spec_images()
+        loading_screen(cfg.STREAM_BLOCKING_PRIORITY)
+
+    # PRELOAD IMAGES - All decoding and resizing for every spec, spread across a worker pool.
+    elif cfg.PRELOAD_ENABLE:
+        preload_images(assets.spec_image_keys())
+    STARTUP.mark('asset preload')
+
+
+# Requests every image the specs (and the background) need, at the priority of the class that uses it. Bundled images
+# are not streamed: they are ready to blit as they are.
+def stream_spec_images() -> None:
+    requests: list[tuple[assets.ImageKey, int]] = [
+        *((spec.img_key, Player.stream_priority) for spec in ent.player_records),
+        *((spec.img_key, Weapon.stream_priority) for spec in ent.weapon_records),
+        *((spec.img_key, Npc.stream_priority) for spec in ent.npc_records),
+        *((assets.prop_template_key(prop_t), Prop.stream_priority) for prop_t in ent.prop_templates),
+    ]
+    if not cfg.DEBUG:  # (DEBUG uses a plain BGCOLOR background.)
+        requests.append((assets.BACKGROUND_KEY, streamloader.PRIORITY_BACKGROUND))
+    for key, priority in requests:
+        if key not in SCACHE and (BUNDLE is None or key not in BUNDLE.entries):
+            STREAMER.request(key, priority)
+
+
+# LOADING SCREEN - A progress bar, shown until every requested image up to max_priority has streamed in.
+def loading_screen(max_priority: int) -> None:
+    clock = pygame.time.Clock()
+    font = pygame.font.Font(None, 36)
+    total = STREAMER.pending(max_priority)
+    bar = pygame.Rect(0, 0, cfg.SCREEN_WIDTH // 2, 24)
+    bar.center = (cfg.SCREEN_WIDTH // 2, cfg.SCREEN_HEIGHT // 2)
+    while (remaining := STREAMER.pending(max_priority)) > 0:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                STREAMER.close()
+                pygame.quit()
+                sys.exit(0)
+        stream_assets(cfg.STREAM_FRAME_BUDGET_MS / 1000)
+        done = total - remaining
+        display_surface.fill(cfg.BGCOLOR)
+        pygame.draw.rect(display_surface, 'white', bar, width=2)
+        pygame.draw.rect(display_surface, 'white', (bar.x, bar.y, bar.width * done // max(total, 1), bar.height))
+        text = font.render(f"Loading... {done}/{total}", True, 'white')
+        display_surface.blit(text, text.get_rect(midbottom=(bar.centerx, bar.top - 12)))
+        pygame.display.flip()
+        clock.tick(60)
 
 
 # ################################################    INSTANTIATION    #################################################
 
-# TODO: See if we can move the prop spec (spraying/generation) code inside of prop instantiation. Probably can/should.
-# NOTE: When using load_image(): To keep image size original, specify None for width and height.
-
-# INSTANITATE PLAYER SPRITE(S)
-for i, player_spec in enumerate(ent.player_specs):
-    player_spec['name'] = player_spec['name'] + str(i)
-    player_spec['instance_id'] = i
-    load_image(
-            filename=player_spec['img_filename'],
-            flip=player_spec['flip'],
-            resize=player_spec['resize'],  # Resizing upon load (with correct alpha) is 90% working. Disabled until ready.
-            width=player_spec['w'],
-            height=player_spec['h'],
-        )
-    player: Player = Player(
-            groups=[all_sprites, all_players],
-            img_filename=player_spec['img_filename'],
-            weapon_spec=ent.weapon_specs[cfg.PLAYER_MAIN_WEAPON_INDEX],  # TODO: Felt hackish initially. Keep like this?
-            all_weapons_group_ref=all_weapons,  # TODO: Felt hackish initially. Keep like this?
-            x=player_spec['x'],
-            y=player_spec['y'],
-            direction=player_spec['d'],
-            speed=player_spec['s'],
-        )  # PyCharm FALSE WARNING HERE (AbstractGroup)
-
-# INSTANITATE NPC SPRITES
-for i, npc_spec in enumerate(ent.npc_specs):
-    npc_spec['instance_id'] = i
-    load_image(
-            filename=npc_spec['img_filename'],
-            flip=npc_spec['flip'],
-            resize=npc_spec['resize'],  # Resizing upon load (with correct alpha) is 90% working. Disabled until ready.
-            width=npc_spec['w'],
-            height=npc_spec['h'],
-        )
-    npc: Npc = Npc(
-            groups=[all_sprites, all_npcs],
-            img_filename=npc_spec['img_filename'],
-            x=npc_spec['x'],
-            y=npc_spec['y'],
-            direction=npc_spec['d'],
-            speed=npc_spec['s'],
-        )  # PyCharm FALSE WARNING HERE (AbstractGroup)
-
-# INSTANITATE PROP SPRITES
-for i, prop_spec in enumerate(prop_specs):
-    prop_spec['instance_id'] = i
-    load_image(
-            filename=prop_spec['img_filename'],
-            flip=prop_spec['flip'],
-            resize=prop_spec['resize'],  # Resizing upon load (with correct alpha) is 90% working. Disabled until ready.
-            width=prop_spec['w'],
-            height=prop_spec['h'],
-        )
-    prop: Prop = Prop(
-            groups=[all_sprites, all_props],
-            img_filename=prop_spec['img_filename'],
-            x=prop_spec['x'],
-            y=prop_spec['y'],
-        )  # PyCharm FALSE WARNING HERE (AbstractGroup)
+# Sprayed props as Prop sprites, or only as pixels in the static layer. (Which needs the layer, so not with the camera.)
+def props_bake_only() -> bool:
+    return cfg.PROP_SPRAY_BAKE_ONLY and cfg.STATIC_PROP_LAYER and not cfg.CAMERA_ENABLE
+
+
+# NOTE: Sprites fetch their surfaces from SCACHE by ImageKey when constructed. Each variant is only loaded once.
+def build_world() -> None:
+    global ESTORE, WPOOL, MEATBALL_PHASE_TABLE, PROP_BATCHES
+    # ENTITY STORE - First, since sprites register with it as they are built.
+    if cfg.ENTITY_STORE_ENABLE:
+        heading_steps = cfg.SPRITE_VARIANT_ANGLE_STEPS if cfg.SPRITE_VARIANTS_ENABLE else 0
+        if cfg.SHARD_WORKERS:
+            import shardsim  # Lazy. Shared memory and worker processes are only needed when sharding.
+            ESTORE = shardsim.ShardedEntityStore(
+                    workers=cfg.SHARD_WORKERS,
+                    capacity=cfg.SHARD_CAPACITY,
+                    heading_steps=heading_steps,
+                )
+        else:
+            ESTORE = entitystore.EntityStore(heading_steps=heading_steps)
+
+    PROP_BATCHES = propspray.spray_props(cfg.PROP_SPRAY_COUNT_SCALE, cfg.PROP_SPRAY_MIN_SPACING)
+
+    # ENVIRONMENT PHASE RESPONSES - Registered before any spec is compiled. Speed comes from the spec 'p/r/c/f' values.
+    PHASES.add_response('speed', phases.spec_letter_column, set_speeds)
+    MEATBALL_PHASE_TABLE = PHASES.compile(ent.weapon_records[1])
+
+    # INSTANITATE PLAYER SPRITE(S)
+    for player_spec in ent.player_records:
+        player: Player = Player(
+                groups=[all_sprites, all_players],
+                img_key=player_spec.img_key,
+                weapon_spec=ent.weapon_records[cfg.PLAYER_MAIN_WEAPON_INDEX],  # TODO: Felt hackish initially. Keep like this?
+                all_weapons_group_ref=all_weapons,  # TODO: Felt hackish initially. Keep like this?
+                x=player_spec.x,
+                y=player_spec.y,
+                direction=player_spec.d,
+                speed=player_spec.s,
+            )  # PyCharm FALSE WARNING HERE (AbstractGroup)
+        PHASES.register(player, PHASES.compile(player_spec))
+
+    # INSTANITATE NPC SPRITES
+    for npc_spec in ent.npc_records:
+        npc: Npc = Npc(
+                groups=[all_sprites, all_npcs],
+                img_key=npc_spec.img_key,
+                x=npc_spec.x,
+                y=npc_spec.y,
+                direction=npc_spec.d,
+                speed=npc_spec.s,
+            )  # PyCharm FALSE WARNING HERE (AbstractGroup)
+        PHASES.register(npc, PHASES.compile(npc_spec))
+
+    # INSTANITATE PROP SPRITES - Unless the sprayed props only go into the static layer. (Baked by run(), no sprites.)
+    if not props_bake_only():
+        for batch in PROP_BATCHES:
+            for x, y in zip(batch.x.tolist(), batch.y.tolist()):
+                Prop(
+                    groups=[all_sprites, all_props],
+                    img_key=batch.img_key,
+                    x=x,
+                    y=y,
+                )  # PyCharm FALSE WARNING HERE (AbstractGroup)
 
+    # LOAD SURFACE CACHE WITH WEAPON DATA. (Weapons not instantiated at this point.)
+    for weapon_spec in ent.weapon_records:
+        SCACHE.get(weapon_spec.img_key)
 
-# LOAD SURFACE CACHE WITH WEAPON DATA. (Weapons not instantiated at this point.)
-for i, weapon_spec in enumerate(ent.weapon_specs):
-    weapon_spec['instance_id'] = i
-    load_image(
-            filename=weapon_spec['img_filename'],
-            flip=weapon_spec['flip'],
-            resize=weapon_spec['resize'],  # Resizing upon load (with correct alpha) is 90% working. Disabled until ready.
-            width=weapon_spec['w'],
-            height=weapon_spec['h'],
-        )
+    # PREALLOCATE THE WEAPON POOL
+    if cfg.WEAPON_POOL_ENABLE:
+        WPOOL = WeaponPool(
+                capacity=cfg.WEAPON_POOL_CAPACITY,
+                when_exhausted=cfg.WEAPON_POOL_EXHAUSTED,
+                img_key=ent.weapon_records[0].img_key,
+            )
+    STARTUP.mark('world build')
 
 
 # ###############################################    MAIN EXECUTION    #################################################
 
-if not __name__ == '__main__':
-    print("PyGameFun main.py has been imported. Some initialization has been performed. "
-        "Main execution will not be started.")
-    sys.exit(0)
-
-bgpath = os.path.join(cfg.ASSET_PATH, cfg.BGIMG)
-
-if cfg.DEBUG:
-    bg_surface = pygame.Surface((cfg.SCREEN_WIDTH, cfg.SCREEN_HEIGHT))
-    bg_surface.fill(cfg.BGCOLOR)
-else:
-    bg_surface = pygame.image.load(bgpath)
-
-running = True
-ephase = None
-g_ephase_name = None
+# FrameCallback(update_seconds, draw_seconds, frame_seconds) - Called at the end of every frame by run(), if given.
+FrameCallback = Callable[[float, float, float], None]
+
+
+# Runs the main loop. With the defaults this is the normal interactive game. For headless/benchmark runs:
+#     frame_limit - stop after this many frames (None runs until the window is closed.)
+#     tickrate - frame rate cap passed to clock.tick(). 0 is uncapped.
+#     fixed_delta_time - if set, every frame simulates exactly this many seconds instead of the measured frame time.
+#         Fully deterministic. (Timers, like meatball spawning, always run on simulated time. See SCHED.)
+#     on_frame - FrameCallback for timing collection.
+def run(
+            frame_limit: int | None = None,
+            tickrate: int | None = cfg.TICKRATE,
+            fixed_delta_time: float | None = None,
+            on_frame: FrameCallback | None = None,
+        ) -> None:
+    global g_sim_time_ms, PROF, ATLAS, CAMERA, RQUEUE
+    bgpath = os.path.join(cfg.ASSET_PATH, cfg.BGIMG)
+
+    if cfg.DEBUG or (STREAMER is not None and BUNDLE is None):  # (A streamed background is swapped in once loaded.)
+        bg_surface = pygame.Surface((cfg.SCREEN_WIDTH, cfg.SCREEN_HEIGHT))
+        bg_surface.fill(cfg.BGCOLOR)
+    elif BUNDLE is not None:
+        bg_surface = BUNDLE.surfaces(assets.BACKGROUND_KEY)[0]
+    else:
+        bg_surface = pygame.image.load(bgpath).convert()  # Converted once, instead of on every blit.
+
+    # CAMERA - Scrolls over the world, following the player. The background is tiled across the world in chunks that
+    #     are only rendered near the view. The static layer and dirty rects assume a fixed screen, so they are not used.
+    chunked_bg: camera.ChunkedBackground | None = None
+    if cfg.CAMERA_ENABLE:
+        CAMERA = camera.Camera(display_surface.get_size(), (cfg.WORLD_WIDTH, cfg.WORLD_HEIGHT))
+        chunked_bg = camera.ChunkedBackground(
+                source=bg_surface,
+                chunk_size=cfg.BG_CHUNK_SIZE,
+                world_size=(cfg.WORLD_WIDTH, cfg.WORLD_HEIGHT),
+                margin=cfg.BG_CHUNK_MARGIN,
+            )
+
+    # STATIC PROP LAYER - Background plus all props, baked into one converted surface. Re-baked only when props change.
+    static_layer: staticlayer.StaticLayer | None = None
+    if cfg.STATIC_PROP_LAYER and CAMERA is None:
+        static_layer = staticlayer.StaticLayer(bg_surface, all_props, display_surface.get_size())
+        if props_bake_only():
+            for batch in PROP_BATCHES:
+                static_layer.add_batch(SCACHE.get(batch.img_key)['surface_r'], batch.x, batch.y)
+
+    # COLLISIONS - Spatial-hash broad phase, with responses per group pair. Weapons go first in their pair since there
+    #     are usually fewer of them than NPCs. (Pairs are found by looking up around each sprite of the first group.)
+    collision_system: collisions.CollisionSystem | None = None
+    if cfg.COLLISIONS_ENABLE:
+        collision_system = collisions.CollisionSystem(cfg.COLLISION_CELL_SIZE)
+        collision_system.track('weapons', all_weapons)
+        collision_system.track('npcs', all_npcs)
+        collision_system.on_pair('weapons', 'npcs', collide_weapon_npc)
+        collision_system.on_pair('npcs', 'npcs', collide_npc_npc)
+
+    # TEXTURE ATLAS - Packed from everything in SCACHE now, and repacked (between frames) whenever SCACHE changes.
+    if cfg.TEXTURE_ATLAS_ENABLE:
+        ATLAS = atlas.TextureAtlas(cfg.TEXTURE_ATLAS_PAGE_SIZE)
+        pack_atlas()
+
+    # RENDER QUEUE - Sprites of all groups in one fblits() (or blits() with the atlas) call. Not for dirty rects, which
+    #     need the drawn areas per sprite.
+    if cfg.RENDER_QUEUE_ENABLE:
+        RQUEUE = renderqueue.RenderQueue()
+
+    # DIRTY RECT RENDERER - Repaint and push only the areas sprites moved through. Falls back to flip() when too much moved.
+    dirty_renderer: dirtyrects.DirtyRectRenderer | None = None
+    if cfg.DIRTY_RECT_RENDERING and CAMERA is None:
+        dirty_renderer = dirtyrects.DirtyRectRenderer(
+                screen=display_surface,
+                background=bg_surface if static_layer is None else static_layer.surface(),
+                max_dirty_fraction=cfg.DIRTY_RECT_MAX_FRACTION,
+                acid=cfg.ACID_MODE,
+                atlas=ATLAS,
+            )
+
+    # FRAME PROFILER - Stage timings, the live overlay and trace export.
+    if cfg.PROFILER_ENABLE:
+        PROF = profiler.FrameProfiler(window=cfg.PROFILER_WINDOW, trace_path=cfg.PROFILER_TRACE_PATH)
+        PROF.show_overlay(cfg.PROFILER_OVERLAY)
+    overlay_key = pygame.key.key_code(cfg.PROFILER_OVERLAY_KEY)
+    prof = PROF  # Local, for the many marks per frame.
+
+    running = True
+    ephase = None
+    g_ephase_name = None
+
+    ephase_count = 0  # 0, not None since we will likly first/always do an arithmetic check on it, not an existence check.
+    clock = pygame.time.Clock()
+    frame_count = 0
+
+    # RECORD / REPLAY - A replay supplies the frame times, instead of the clock. (Timers replay from those.)
+    recorder = INPUT if isinstance(INPUT, replay.Recorder) else None
+    replayer = INPUT if isinstance(INPUT, replay.Replayer) else None
+
+    all_weapons_group_ref=all_weapons  # Here for clarity. We need to pass this to anything that instantiates weapons.
+    all_sprites_group_ref=all_sprites  # Again, for clarity. TODO: There is a CHANGE I may need to pass this in IF I ever
+    #                                                              need to use it. Currently not used and not passed in.
+
+    # FIXED TIMESTEP - The simulation advances in steps of exactly 1/SIM_RATE seconds, however fast frames are drawn.
+    #     Without it, there is one simulation step per frame, of the measured frame time.
+    fixed_step: timestep.FixedTimestep | None = None
+    interpolator: timestep.Interpolator | None = None
+    if cfg.FIXED_TIMESTEP_ENABLE:
+        fixed_step = timestep.FixedTimestep(cfg.SIM_RATE, cfg.SIM_MAX_STEPS_PER_FRAME)
+        if cfg.SIM_INTERPOLATE:
+            interpolator = timestep.Interpolator([all_npcs, all_weapons, all_players])
+
+    # VIEW CULLED WRITE-BACK - With the camera, the store only writes back the rects of sprites near the view, unless
+    #     collisions or interpolation read every rect. (Camera.view is updated in place, so this follows the camera.)
+    if ESTORE is not None and CAMERA is not None and collision_system is None and interpolator is None:
+        ESTORE.view = CAMERA.view
+
+    # RANDOM MEATBALLS - A fresh random pause before every spawn: MEATBALL_SPAWN_TIME_MIN plus 0..RANGE milliseconds.
+    SCHED.every(cfg.MEATBALL_SPAWN_TIME_MIN, event_meatball, all_weapons_group_ref,
+                jitter=cfg.MEATBALL_SPAWN_TIME_RANGE)
+    STARTUP.mark('loop setup')  # Background, layers, renderers etc.
+
+    #   * * * * * * *    MAIN LOOP    * * * * * * *
+    while running:
+        prof.begin_frame()
+        g_delta_time = clock.tick(tickrate) / 1000  # Seconds elapsed for a single frame (e.g. - 60 Frm/sec = 0.017 sec/Frm)
+        if fixed_delta_time is not None:
+            g_delta_time = fixed_delta_time
+        prof.mark('tick (idle)')
+        frame_start = time.perf_counter()
+
+
+        # ##################################################    INPUT    ###################################################
+
+        for event in pygame.event.get():  # Check all new events since the last main loop iteration
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN and event.key == overlay_key:
+                prof.toggle_overlay()
+
+        INPUT.poll()  # AFTER the event loop, which pumps the events. The key state is then this frame's, not the last.
+        if replayer is not None:
+            g_delta_time = replayer.delta_time
+        prof.mark('input')
+
+        # STREAMING - Finish what the loader threads decoded, within a small budget per frame, so nothing ever hitches.
+        if STREAMER is not None:
+            props_changed = stream_assets(cfg.STREAM_FRAME_BUDGET_MS / 1000)
+            if props_changed:
+                if collision_system is not None and 'props' in collision_system.hashes:
+                    collision_system.refile('props')  # Static sprites are only filed once, at their old size.
+                if static_layer is not None:
+                    all_props.dirty = True  # Re-bake with the real images.
+                elif dirty_renderer is not None:
+                    dirty_renderer.set_background(bg_surface)  # Rebuild the composite.
+            if g_background is not None and g_background is not bg_surface:
+                bg_surface = g_background
+                if chunked_bg is not None:
+                    chunked_bg.source = bg_surface
+                    chunked_bg.chunks.clear()  # Re-rendered from the new source as they come into view.
+                if static_layer is not None:
+                    static_layer.set_background(bg_surface)
+                elif dirty_renderer is not None:
+                    dirty_renderer.set_background(bg_surface)
+            prof.mark('stream')
+
+        # SIMULATION STEPS - Everything below up to the drawing runs once per step.
+        if fixed_step is None:
+            sim_steps = 1
+            step_time = g_delta_time
+        else:
+            sim_steps = fixed_step.advance(g_delta_time)
+            step_time = fixed_step.step
+
+        for sim_step in range(sim_steps):
+            if interpolator is not None and sim_step == sim_steps - 1:
+                interpolator.snapshot()  # Positions before the last step. Drawing blends from these.
+            g_sim_time_ms += step_time * 1000
+            SCHED.advance(g_sim_time_ms)  # Fires due timers: cooldowns, spawns.
+            prof.mark('timers')
+
+
+            # #####################################    ENVIRONMENT PHASE PROCESSING    #####################################
+
+            # ENVIRO_PHASES is a collections.deque instance and we popleft() the first/current 'phase'.
+            #     Then we add the phase we removed from the left/start of the (deque) to the end (right side/last position).
+            #     Phase lengths are counted in simulation steps. (The same as frames unless FIXED_TIMESTEP_ENABLE.)
+            if ephase is None:
+                ephase = cfg.ENVIRO_PHASES[0]
+                g_ephase_name = ephase[0]
+                ephase_count = ephase[1]
+                cut_ephase = cfg.ENVIRO_PHASES.popleft()
+                cfg.ENVIRO_PHASES.append(cut_ephase)
+                PHASES.enter(g_ephase_name)  # All phase-dependent values change here, in bulk. Not every frame.
+            else:
+                ephase_count -= 1  # Decrement the counter for the current phase.
+                if ephase_count < 1:
+                    ephase = None
+            prof.mark('enviro phase')
+
+
+            #   ^ ^ ^ ^ ^ ^    MAIN UPDATE ACTIONS    ^ ^ ^ ^ ^ ^
+            if ESTORE is None:
+                if static_layer is None:  # Baked props are not updated at all.
+                    all_props.update(step_time, g_ephase_name)
+                    prof.mark('update props')
+                all_npcs.update(step_time, g_ephase_name)
+                prof.mark('update npcs')
+                all_players.update(step_time, g_ephase_name)
+                prof.mark('update players')
+                all_weapons.update(step_time, g_ephase_name)  # Must update Weapons AFTER Player since Player creates Weapons during Player update.
+                prof.mark('update weapons')
+            else:
+                all_players.update(step_time, g_ephase_name)
+                prof.mark('update players')
+                ESTORE.update(step_time)  # Npcs, Weapons and Props in one go. AFTER Player, for the same reason as above.
+                prof.mark('update store')
+            INPUT.consume()  # Key presses were handled by this step. The next step must not see them again.
 
-ephase_count = 0  # 0, not None since we will likly first/always do an arithmetic check on it, not an existence check.
-clock = pygame.time.Clock()
+            #   x x x x x x    COLLISIONS    x x x x x x
+            if collision_system is not None:
+                collision_system.update()  # Re-file only the sprites that changed cells.
+                collision_system.process()  # Find overlapping pairs and call the responses.
+                prof.mark('collisions')
 
-# CUSTOM EVENTS - Random meatballs
-meatball_event = pygame.event.custom_type()
-pygame.time.set_timer(meatball_event, cfg.MEATBALL_SPAWN_TIME_MIN + cfg.MEATBALL_SPAWN_TIME_RANGE)
-# TODO: Meatball spawn time with current timer is only set randomly once at game start. MAKE IT VARY ALL THE TIME.
 
-all_weapons_group_ref=all_weapons  # Here for clarity. We need to pass this to anything that instantiates weapons.
-all_sprites_group_ref=all_sprites  # Again, for clarity. TODO: There is a CHANGE I may need to pass this in IF I ever
-#                                                              need to use it. Currently not used and not passed in.
+        # ##################################################    DRAW    ####################################################
 
-#   * * * * * * *    MAIN LOOP    * * * * * * *
-while running:
-    g_delta_time = clock.tick(cfg.TICKRATE) / 1000  # Seconds elapsed for a single frame (e.g. - 60 Frm/sec = 0.017 sec/Frm)
+        update_end = time.perf_counter()
 
+        if ATLAS is not None and ATLAS.generation != SCACHE.generation:
+            pack_atlas()  # New (or evicted) images since the last pack. Rare after startup.
 
-    # ##################################################    INPUT    ###################################################
+        if interpolator is not None:
+            interpolator.apply(fixed_step.alpha)  # Draw everything part-way to where the next step will put it.
 
-    for event in pygame.event.get():  # Check all new events since the last main loop iteration
-        if event.type == pygame.QUIT:
+        if dirty_renderer is not None:
+            if static_layer is not None and static_layer.dirty:  # Props changed. The re-baked layer is the new background.
+                dirty_renderer.set_background(static_layer.surface())
+            dirty_renderer.draw(
+                    static_groups=[] if static_layer is not None else [all_props],
+                    dynamic_groups=[all_npcs, all_weapons, all_players, prof.overlay_group],
+                )  # Includes the display.update() (or flip() on fallback.)
+            prof.mark('dirty draw + update')
+        else:
+            # REDRAW THE BACKGROUND
+            if CAMERA is not None:
+                player = next(iter(all_players), None)
+                if player is not None:
+                    CAMERA.follow(player.rect.center)
+                chunked_bg.update(CAMERA.view)  # Load chunks coming near the view. Evict far away ones.
+                if cfg.ACID_MODE is False:
+                    chunked_bg.draw(display_surface, CAMERA.view)
+            elif static_layer is not None:
+                # Background AND all props in a single blit. In ACID_MODE only when the layer has just been (re)baked.
+                if cfg.ACID_MODE is False or static_layer.dirty:
+                    display_surface.blit(static_layer.surface(), (0, 0))
+            elif cfg.ACID_MODE is False:
+                display_surface.blit(bg_surface, (0, 0))
+            prof.mark('background')
+
+            #   | | | | | |    MAIN DRAWING ACTIONS    | | | | | |
+            if RQUEUE is not None:  # Same layer order, one blit call.
+                if static_layer is None:
+                    queue_group(all_props)
+                queue_group(all_npcs)
+                queue_group(all_weapons)
+                queue_group(all_players)
+                prof.mark('draw queue')
+                RQUEUE.submit(display_surface)
+                prof.mark('draw submit')
+            else:
+                if static_layer is None:
+                    draw_group(all_props)
+                    prof.mark('draw props')
+                draw_group(all_npcs)
+                prof.mark('draw npcs')
+                draw_group(all_weapons)
+                prof.mark('draw weapons')
+                draw_group(all_players)
+                prof.mark('draw players')
+            prof.overlay_group.draw(display_surface)  # Empty unless the profiler overlay is showing.
+            prof.mark('draw overlay')
+
+            pygame.display.flip()  # Similar to update but not entire screen. TODO: Clarify
+            prof.mark('flip')
+
+        if interpolator is not None:
+            interpolator.restore()  # Back to the true simulated positions.
+
+        if recorder is not None:
+            recorder.end_frame(g_delta_time)
+        elif replayer is not None and replayer.finished:
             running = False
-        if event.type == meatball_event:
-            event_meatball(all_weapons_group_ref)
 
+        prof.end_frame()
+        if frame_count == 0:
+            STARTUP.mark('first frame')
+            if cfg.STARTUP_REPORT:
+                print(STARTUP.report())
+        frame_end = time.perf_counter()
+        if on_frame is not None:
+            on_frame(update_end - frame_start, frame_end - update_end, frame_end - frame_start)
+        frame_count += 1
+        if frame_limit is not None and frame_count >= frame_limit:
+            running = False
 
-    # #######################################    ENVIRONMENT PHASE PROCESSING    #######################################
-
-    # ENVIRO_PHASES is a collections.deque instance and we popleft() the first/current 'phase'.
-    #     Then we add the phase we removed from the left/start of the (deque) to the end (right side/last position).
-    if ephase is None:
-        ephase = cfg.ENVIRO_PHASES[0]
-        g_ephase_name = ephase[0]
-        ephase_count = ephase[1]
-        cut_ephase = cfg.ENVIRO_PHASES.popleft()
-        cfg.ENVIRO_PHASES.append(cut_ephase)
-    else:
-        ephase_count -= 1  # Decrement the counter for the current phase.
-        if ephase_count < 1:
-            ephase = None
-
-
-    # ##################################################    DRAW    ####################################################
-
-
-    #   ^ ^ ^ ^ ^ ^    MAIN UPDATE ACTIONS    ^ ^ ^ ^ ^ ^
-    all_props.update(g_delta_time, g_ephase_name)
-    all_npcs.update(g_delta_time, g_ephase_name)
-    all_players.update(g_delta_time, g_ephase_name)
-    all_weapons.update(g_delta_time, g_ephase_name)  # Must update Weapons AFTER Player since Player creates Weapons during Player update.
-
-    # REDRAW THE BACKGROUND
-    if cfg.ACID_MODE is False:
-        display_surface.blit(bg_surface, (0, 0))
-
-    #   | | | | | |    MAIN DRAWING ACTIONS    | | | | | |
-    all_props.draw(display_surface)
-    all_npcs.draw(display_surface)
-    all_weapons.draw(display_surface)
-    all_players.draw(display_surface)
-
-    pygame.display.flip()  # Similar to update but not entire screen. TODO: Clarify
+    #   * _ * _ * _ *    END MAIN LOOP    * _ * _ * _ *
 
-#   * _ * _ * _ *    END MAIN LOOP    * _ * _ * _ *
+    PROF.close()  # Writes the trace file, if one was asked for.
+    if ESTORE is not None:
+        ESTORE.sync_rects()  # The state digest reads every rect, culled or not.
+    if recorder is not None:
+        recorder.close(replay.state_digest(all_sprites))
+    elif replayer is not None:
+        replayer.verify(replay.state_digest(all_sprites))
 
 
-pygame.quit()
+def main() -> None:
+    global INPUT
+    # RANDOM SEED - Seeded before anything random happens (prop spray.) A replay brings the seed it was recorded with.
+    if cfg.REPLAY_PLAY_PATH:
+        INPUT = replay.Replayer(cfg.REPLAY_PLAY_PATH)
+        seed = INPUT.seed
+    else:
+        seed = cfg.RANDOM_SEED if cfg.RANDOM_SEED is not None else random.randrange(2 ** 63)
+        if cfg.REPLAY_RECORD_PATH:
+            INPUT = replay.Recorder(INPUT, cfg.REPLAY_RECORD_PATH, seed)
+    random.seed(seed)
+    STARTUP.mark('config')
+
+    init_display()
+    preload_assets()
+    build_world()
+    run()
+
+    if isinstance(INPUT, replay.Replayer):
+        if INPUT.matched is None:
+            print("REPLAY: Not verified. (Replay stopped early, or the recording has no final state.)")
+        else:
+            print(f"REPLAY: Final simulation state {'MATCHES' if INPUT.matched else 'DIFFERS FROM'} the recording.")
+
+    if cfg.DEBUG:
+        print(SCACHE.report())
+        if WPOOL is not None:
+            print(f"WPOOL: {WPOOL.stats()}")
+        if VARIANTS is not None:
+            print(f"VARIANTS: {VARIANTS.stats()}")
+        if ESTORE is not None:
+            print(f"ESTORE: {ESTORE.stats()}")
+        if STREAMER is not None:
+            print(f"STREAMER: {STREAMER.stats()}")
+        print(f"SCHED: {SCHED.stats()}")
+        for stage, (avg_ms, worst_ms) in PROF.summary().items():
+            print(f"PROF: {stage:<20} avg {avg_ms:8.3f} ms    max {worst_ms:8.3f} ms")
+
+    if ESTORE is not None:
+        ESTORE.close()
+    if STREAMER is not None:
+        STREAMER.close()
+    pygame.quit()
+
+
+STARTUP.mark('import')  # The whole module has been executed, including every import it does.
+
+if __name__ == '__main__':
+    main()
 
 
 ##
@@ -0,0 +1,123 @@
+# membench.py
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Headless. Must be set before pygame is imported (by main.)
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')  # Keep stdout clean for the JSON report.
+import argparse
+import gc
+import json
+import time
+import timeit
+import tracemalloc
+import types
+import entity
+
+
+# ##############################################    MEMORY BENCHMARK    ################################################
+
+# Memory per entity and attribute access cost, for the slotted Entity classes and the compiled spec records.
+# For each count, that many Npcs and Props are built (outside of any group, so nothing else holds on to them) and the
+# bytes tracemalloc saw allocated for them are divided by the count. Everything an entity owns is included: the object
+# itself, its FRect, its Vector2 and Sprite's group dict. (The surfaces are shared through SCACHE and not counted.)
+# 'has_dict' says whether any entity ended up with an instance __dict__ after all, i.e. an attribute is missing from
+# __slots__. The access timings read four attributes per entity over all entities, and one spec field per lookup from
+# the spec dict (spec['s']) and from its compiled record (spec.s), in nanoseconds per read.
+# The baseline: every entity is measured again as an instance of an unslotted copy of its classes (see unslotted()),
+# built here from the game's own classes, so the two only differ in __slots__. 'bytes_saved' is the difference.
+#     python membench.py --counts 10000 100000
+
+def entity_bytes(build, count: int) -> tuple[list, float]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return entities, (after - before) / count
+
+
+def access_ns(entities: list, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for e in entities:
+            e.x, e.speed, e.dir, e.store_index
+    return 1e9 * (time.perf_counter() - start) / (rounds * 4 * len(entities))
+
+
+# A copy of cls without __slots__, derived from base (an unslotted copy of its parent, or the same parent.) Its
+# instances keep all attributes in the (inline) instance dict, like the classes had before they got __slots__.
+def unslotted(cls: type, base: type) -> type:
+    skipped = {'__slots__', '__dict__', '__weakref__', *cls.__slots__}
+    copy = type(cls.__name__, (base,), {name: value for name, value in vars(cls).items() if name not in skipped})
+    for name, value in vars(copy).items():
+        # Zero-argument super() finds the class in the function's __class__ cell, which still holds cls. Rebind it.
+        if isinstance(value, types.FunctionType) and '__class__' in value.__code__.co_freevars:
+            closure = tuple(types.CellType(copy) if var == '__class__' else cell
+                            for var, cell in zip(value.__code__.co_freevars, value.__closure__))
+            function = types.FunctionType(value.__code__, value.__globals__, name, value.__defaults__, closure)
+            function.__kwdefaults__ = value.__kwdefaults__
+            setattr(copy, name, function)
+    return copy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory per entity and attribute access cost.")
+    parser.add_argument('--counts', type=int, nargs='+', default=[10000, 100000], help="Entity counts.")
+    parser.add_argument('--rounds', type=int, default=5, help="Passes over all entities per access timing.")
+    parser.add_argument('--out', help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    import main as game
+    game.init_display()
+    game.preload_assets()
+    plain_entity = unslotted(game.Entity, game.Entity.__base__)
+    classes = {
+        'npc': (game.Npc, unslotted(game.Npc, plain_entity)),
+        'prop': (game.Prop, unslotted(game.Prop, plain_entity)),
+    }
+    npc_spec = entity.npc_records[0]
+    builders = {
+        'npc': lambda cls, i: cls(groups=[], img_key=npc_spec.img_key, x=npc_spec.x, y=npc_spec.y,
+                                  direction=npc_spec.d, speed=npc_spec.s),
+        'prop': lambda cls, i: cls(groups=[], img_key=npc_spec.img_key, x=float(i), y=float(i)),
+    }
+
+    results = []
+    for count in args.counts:
+        for kind, build in builders.items():
+            result = {'entity': kind, 'count': count}
+            for label, cls in zip(('slots', 'no_slots'), classes[kind]):
+                entities, per_entity = entity_bytes(lambda i: build(cls, i), count)
+                result[label] = {
+                    'bytes_per_entity': per_entity,
+                    'attr_read_ns': access_ns(entities, args.rounds),
+                    'has_dict': any(hasattr(e, '__dict__') and e.__dict__ for e in entities),  # After timing: builds it.
+                }
+                del entities
+            result['bytes_saved'] = result['no_slots']['bytes_per_entity'] - result['slots']['bytes_per_entity']
+            results.append(result)
+    game.pygame.quit()
+
+    spec, record = entity.npc_specs[0], entity.npc_records[0]
+    reads = 1_000_000
+    report = {
+        'results': results,
+        'spec_read_ns': {
+            'dict': 1e9 * min(timeit.repeat(lambda: spec['s'], number=reads, repeat=3)) / reads,
+            'record': 1e9 * min(timeit.repeat(lambda: record.s, number=reads, repeat=3)) / reads,
+        },
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
+
+
+##
+#
@@ -0,0 +1,101 @@
+# phases.py
+
+import sys
+from typing import Callable, Iterable, KeysView
+
+
+# #############################################    ENVIRONMENT PHASES    ###############################################
+
+# The PhaseEngine applies the environment phases (cfg.ENVIRO_PHASES) to entities. Specs (entity.SpecRecord) carry one
+# value per phase for an attribute (speed: 'p', 'r', 'c', 'f' - the first letters of the phase names.) Instead of every
+# entity looking up its own value every frame, each spec is compiled ONCE into a PhaseTable: per attribute, a tuple
+# holding the value for every phase, in phase order. Entities are filed into buckets of identical (attribute, values)
+# pairs, so all entities made from the same spec share a bucket. When the phase changes, enter() walks the buckets and
+# hands each one, with its single new value, to the attribute's setter in one call. On frames where the phase did not
+# change, nothing at all happens.
+# Responses are pluggable per attribute with add_response(attribute, column, setter):
+#     column(phase_name, spec) -> value - compiles the attribute's value for a phase from a spec.
+#     setter(entities, value) - applies one value to many entities. Defaults to a plain setattr() loop. A custom
+#         setter can do the batch smarter (e.g. one NumPy assignment into an EntityStore.)
+# Only attributes that have a response registered BEFORE a spec is compiled are part of its table.
+
+PhaseColumn = Callable[[str, tuple], object]
+PhaseSetter = Callable[[KeysView, object], None]
+PhaseTable = tuple[tuple[str, tuple], ...]  # ((attribute, values per phase), ...) - also the bucket keys.
+
+
+def spec_letter_column(phase_name: str, spec: tuple) -> object:
+    # The spec field for a phase is the first letter of its name: 'peace' -> 'p'
+    key = phase_name[0]
+    if key not in spec._fields:
+        raise ValueError(f"FATAL: Invalid ephase_name '{phase_name}'. Spec has no '{key}' value. "
+                         "Check values in ENVIRO_PHASES config.")
+    return getattr(spec, key)
+
+
+def setattr_setter(attribute: str) -> PhaseSetter:
+    def setter(entities: KeysView, value: object) -> None:
+        for entity in entities:
+            setattr(entity, attribute, value)
+    return setter
+
+
+class PhaseEngine:
+    def __init__(self, phases: Iterable[tuple[str, int]]):
+        self.phase_names: list[str] = list(dict.fromkeys(name for name, _ in phases))  # Unique, in first-seen order.
+        self.phase_index: dict[str, int] = {name: i for i, name in enumerate(self.phase_names)}
+        self.columns: dict[str, PhaseColumn] = {}
+        self.setters: dict[str, PhaseSetter] = {}
+        self.buckets: dict[tuple[str, tuple], dict] = {}  # (attribute, values) -> entities (a dict used as an ordered set.)
+        self.current: int = -1  # Index of the current phase. -1 until the first enter().
+        self.transitions: int = 0
+
+    def add_response(self, attribute: str, column: PhaseColumn, setter: PhaseSetter | None = None) -> None:
+        self.columns[attribute] = column
+        self.setters[attribute] = setter if setter is not None else setattr_setter(attribute)
+
+    def compile(self, spec: tuple) -> PhaseTable:
+        return tuple(
+            (attribute, tuple(column(name, spec) for name in self.phase_names))
+            for attribute, column in self.columns.items()
+        )
+
+    # Files the entity under its table's buckets. Once a phase is running, the entity gets its values right away.
+    def register(self, entity, table: PhaseTable) -> None:
+        entity.phase_table = table
+        for bucket_key in table:
+            bucket = self.buckets.get(bucket_key)
+            if bucket is None:
+                bucket = self.buckets[bucket_key] = {}
+            bucket[entity] = None
+            if self.current >= 0:
+                attribute, values = bucket_key
+                self.setters[attribute]({entity: None}.keys(), values[self.current])
+
+    def unregister(self, entity) -> None:
+        for bucket_key in getattr(entity, 'phase_table', ()):
+            self.buckets[bucket_key].pop(entity, None)
+        entity.phase_table = ()
+
+    # Call only when the phase changes. Re-entering the current phase does nothing.
+    def enter(self, phase_name: str) -> None:
+        index = self.phase_index.get(phase_name)
+        if index is None:
+            raise ValueError(f"FATAL: Invalid ephase_name '{phase_name}'. Check values in ENVIRO_PHASES config.")
+        if index == self.current:
+            return
+        self.current = index
+        self.transitions += 1
+        setters = self.setters
+        for (attribute, values), entities in self.buckets.items():
+            if entities:
+                setters[attribute](entities.keys(), values[index])
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun phases.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
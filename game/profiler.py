@@ -0,0 +1,196 @@
+# profiler.py
+
+import sys
+import collections
+import csv
+import json
+import time
+import pygame
+
+
+# ##############################################    FRAME PROFILER    ##################################################
+
+# Times every stage of the main loop, every frame. The main loop calls begin_frame() at the top of the loop, mark(stage)
+# right AFTER each stage finishes and end_frame() at the bottom. A mark costs one perf_counter() call and one list
+# append, so it can stay on in normal play. Each stage is timed from the previous mark (or begin_frame) to its own mark.
+# Per stage, the last 'window' frames are kept for rolling averages and worst-case times. The live overlay shows them,
+# toggled with a key (cfg.PROFILER_OVERLAY_KEY.) Its text is only re-rendered every 'refresh' frames, since rendering
+# text is far from free.
+# With a trace_path, every stage of every frame is also recorded and written out by close(), for finding stutter
+# offline. A path ending in .json gives Chrome trace-event JSON (chrome://tracing or https://ui.perfetto.dev), anything
+# else gives CSV. Traces grow by one row per stage per frame, so they are meant for runs of minutes, not hours.
+# NullProfiler has the same interface and does nothing, so the main loop does not need an 'if' around every mark.
+
+Mark = tuple[str, float, float]  # (stage, start, end) - perf_counter() seconds.
+
+
+class ProfilerOverlay(pygame.sprite.Sprite):
+    # A sprite so the overlay can simply be drawn (and dirty-rect tracked) like any other sprite group.
+    def __init__(self, groups, topleft: tuple[int, int]):
+        super().__init__(groups)
+        self.image = pygame.Surface((1, 1), pygame.SRCALPHA)
+        self.rect = self.image.get_frect(topleft=topleft)
+        self.font = pygame.font.Font(None, 20)
+
+    def set_lines(self, lines: list[str]) -> None:
+        rendered = [self.font.render(line, True, 'white') for line in lines]
+        line_h = self.font.get_linesize()
+        width = max(surface.get_width() for surface in rendered) + 12
+        self.image = pygame.Surface((width, line_h * len(rendered) + 8), pygame.SRCALPHA)
+        self.image.fill((0, 0, 0, 170))
+        self.image.fblits([(surface, (6, 4 + i * line_h)) for i, surface in enumerate(rendered)])
+        self.rect = self.image.get_frect(topleft=self.rect.topleft)
+
+
+class FrameProfiler:
+    def __init__(self, window: int = 120, refresh: int = 15, trace_path: str | None = None):
+        self.window: int = window
+        self.refresh: int = refresh
+        self.trace_path: str | None = trace_path
+        self.history: dict[str, collections.deque] = {}  # Stage -> last 'window' durations in seconds. In stage order.
+        self.frame_history: collections.deque = collections.deque(maxlen=window)
+        self.marks: list[Mark] = []  # This frame.
+        self.trace: list[tuple[int, list[Mark]]] = []  # (frame, marks) for every frame, only when tracing.
+        self.frame: int = 0
+        self.frame_start: float = 0.0
+        self.last: float = 0.0
+        self.overlay_group: pygame.sprite.Group = pygame.sprite.Group()
+        self.overlay: ProfilerOverlay | None = None
+
+    def begin_frame(self) -> None:
+        self.frame_start = self.last = time.perf_counter()
+        self.marks = []
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.marks.append((stage, self.last, now))
+        self.last = now
+
+    def end_frame(self) -> None:
+        history = self.history
+        for stage, start, end in self.marks:
+            durations = history.get(stage)
+            if durations is None:
+                durations = history[stage] = collections.deque(maxlen=self.window)
+            durations.append(end - start)
+        self.frame_history.append(self.last - self.frame_start)
+        if self.trace_path is not None:
+            self.trace.append((self.frame, self.marks))
+        if self.overlay is not None and self.frame % self.refresh == 0:
+            self.overlay.set_lines(self.overlay_lines())
+        self.frame += 1
+
+    # Rolling (average, worst) in milliseconds, per stage, over the last 'window' frames the stage ran in.
+    def summary(self) -> dict[str, tuple[float, float]]:
+        result = {stage: (1000 * sum(d) / len(d), 1000 * max(d)) for stage, d in self.history.items() if d}
+        if self.frame_history:
+            d = self.frame_history
+            result['frame'] = (1000 * sum(d) / len(d), 1000 * max(d))
+        return result
+
+    def overlay_lines(self) -> list[str]:
+        lines = [f"{'stage':<20}{'avg ms':>8}{'max ms':>8}"]
+        lines += [f"{stage:<20}{avg:>8.3f}{worst:>8.3f}" for stage, (avg, worst) in self.summary().items()]
+        return lines
+
+    def show_overlay(self, visible: bool) -> None:
+        if visible and self.overlay is None:
+            self.overlay = ProfilerOverlay(self.overlay_group, (8, 8))
+            self.overlay.set_lines(self.overlay_lines())
+        elif not visible and self.overlay is not None:
+            self.overlay.kill()
+            self.overlay = None
+
+    def toggle_overlay(self) -> None:
+        self.show_overlay(self.overlay is None)
+
+    def close(self) -> None:
+        if self.trace_path is None:
+            return
+        if self.trace_path.endswith('.json'):
+            self.write_chrome_trace(self.trace_path)
+        else:
+            self.write_csv(self.trace_path)
+
+    def write_csv(self, path: str) -> None:
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'stage', 'start_ms', 'duration_ms'])
+            for frame, marks in self.trace:
+                for stage, start, end in marks:
+                    writer.writerow([frame, stage, f"{1000 * start:.4f}", f"{1000 * (end - start):.4f}"])
+
+    def write_chrome_trace(self, path: str) -> None:
+        # Complete ('X') events in microseconds. Each frame is an event of its own, with its stages nested inside.
+        events = []
+        for frame, marks in self.trace:
+            if not marks:
+                continue
+            events.append({'name': f"frame {frame}", 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': 1e6 * marks[0][1], 'dur': 1e6 * (marks[-1][2] - marks[0][1])})
+            events += [{'name': stage, 'ph': 'X', 'pid': 1, 'tid': 1, 'ts': 1e6 * start, 'dur': 1e6 * (end - start)}
+                       for stage, start, end in marks]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+class NullProfiler:
+    def __init__(self):
+        self.overlay_group: pygame.sprite.Group = pygame.sprite.Group()  # Always empty.
+
+    def begin_frame(self) -> None:
+        pass
+
+    def mark(self, stage: str) -> None:
+        pass
+
+    def end_frame(self) -> None:
+        pass
+
+    def summary(self) -> dict[str, tuple[float, float]]:
+        return {}
+
+    def show_overlay(self, visible: bool) -> None:
+        pass
+
+    def toggle_overlay(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+# ###############################################    STARTUP TIMER    ##################################################
+
+# Time-to-first-frame, broken down by startup phase. mark(phase) is called right AFTER each phase finishes, and each
+# phase is timed from the previous mark (or the origin.) The origin is taken at the very top of main.py, so the first
+# phase covers importing all modules. (Interpreter startup itself, before main.py runs, is not included.)
+
+class StartupTimer:
+    def __init__(self, origin: float):
+        self.origin: float = origin  # perf_counter() seconds.
+        self.last: float = origin
+        self.phases: dict[str, float] = {}  # Phase -> seconds, in order.
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def summary(self) -> dict[str, float]:
+        # Milliseconds per phase, plus the 'total' so far.
+        summary = {phase: 1000 * seconds for phase, seconds in self.phases.items()}
+        summary['total'] = 1000 * (self.last - self.origin)
+        return summary
+
+    def report(self) -> str:
+        return '\n'.join(f"STARTUP: {phase:<16} {ms:9.1f} ms" for phase, ms in self.summary().items())
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun profiler.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
@@ -0,0 +1,123 @@
+# propspray.py
+
+import sys
+import random
+import numpy
+import entity as ent
+import assets
+
+
+# ###############################################    PROP SPRAYING    ##################################################
+
+# Props are 'sprayed' from the prop templates in entity.py: spray_count positions scattered over the square of
+# +/- spray_radius around the template x/y. All positions of a template are generated in one NumPy call and kept as
+# a PropBatch - one ImageKey plus compact X and Y (center) arrays - instead of one spec dict per prop. Batches feed
+# either the Prop instantiation in main.py, or straight into a baked static layer without any Prop sprites at all
+# (see StaticLayer.add_batch()), which is how scenes with 50k+ props stay cheap.
+# With min_spacing > 0, positions are Poisson-disk samples instead: no two props of a template closer than min_spacing.
+# That is dart throwing in vectorized rounds over a background grid with cells of min_spacing / sqrt(2), so a cell
+# holds at most one accepted point and a candidate only has to be checked against the 5x5 cells around it. If the area
+# is full before spray_count points fit, the batch simply has fewer props.
+# The NumPy generator is seeded from 'random', so cfg.RANDOM_SEED (and replays) still reproduce the same spray.
+
+POISSON_ROUNDS: int = 64  # Max dart-throwing rounds per template.
+POISSON_STALL_ROUNDS: int = 4  # Give up after this many rounds in a row that (almost) accepted nothing. (Area full.)
+POISSON_MIN_YIELD: float = 0.002  # A round accepting fewer than this fraction of its candidates counts as stalled.
+
+
+class PropBatch:
+    def __init__(self, name: str, img_key: assets.ImageKey, x: numpy.ndarray, y: numpy.ndarray):
+        self.name: str = name  # Template name.
+        self.img_key: assets.ImageKey = img_key
+        self.x: numpy.ndarray = x  # Prop center X, float64
+        self.y: numpy.ndarray = y  # Prop center Y, float64
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+def spray_uniform(rng: numpy.random.Generator, cx: float, cy: float, radius: float,
+                  count: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+    offsets = rng.uniform(-radius, radius, size=(2, count))
+    return cx + offsets[0], cy + offsets[1]
+
+
+# NOTE: Returns FEWER than count points when the square fills up first (e.g. about 1.5k of 2000 at spacing 20 and
+# radius 500.) That is not an error: the square simply holds no more props at that spacing.
+def spray_poisson(rng: numpy.random.Generator, cx: float, cy: float, radius: float, count: int,
+                  min_spacing: float) -> tuple[numpy.ndarray, numpy.ndarray]:
+    cell = min_spacing / numpy.sqrt(2.0)
+    cells = int(numpy.ceil(2.0 * radius / cell)) or 1
+    grid = numpy.full((cells + 4, cells + 4), -1, dtype=numpy.int64)  # Accepted point index per cell. 2 cells of padding.
+    px = numpy.empty(count)  # Accepted points, relative to the square's top-left corner.
+    py = numpy.empty(count)
+    accepted = 0
+    stalled = 0
+    min_sq = min_spacing * min_spacing
+    offsets = [(ox, oy) for oy in range(-2, 3) for ox in range(-2, 3) if (ox, oy) != (0, 0)]
+    for _ in range(POISSON_ROUNDS):
+        if accepted == count or stalled == POISSON_STALL_ROUNDS:
+            break
+        # CANDIDATES - Plenty more than missing, since many get rejected as the area fills up.
+        candidates = rng.uniform(0.0, 2.0 * radius, size=(2, 4 * (count - accepted) + 16))
+        x, y = candidates
+        gx = numpy.minimum((x / cell).astype(numpy.int64), cells - 1) + 2
+        gy = numpy.minimum((y / cell).astype(numpy.int64), cells - 1) + 2
+
+        # ONE PER CELL - Drop candidates in occupied cells and all but the first candidate of each free cell.
+        keep = grid[gy, gx] < 0
+        x, y, gx, gy = x[keep], y[keep], gx[keep], gy[keep]
+        _, first = numpy.unique(gy * (cells + 4) + gx, return_index=True)
+        first.sort()  # Back in draw order, so the earlier candidate wins.
+        x, y, gx, gy = x[first], y[first], gx[first], gy[first]
+
+        # NEIGHBOURS - Too close to an accepted point, or to an earlier candidate of this round: rejected. Only the
+        #     occupied neighbour cells are looked at (an empty cell holds -1, which is no index into the points.)
+        order = numpy.arange(len(x))
+        batch = numpy.full_like(grid, -1)
+        batch[gy, gx] = order
+        ok = numpy.ones(len(x), dtype=bool)
+        for ox, oy in offsets:
+            other = grid[gy + oy, gx + ox]
+            has = numpy.flatnonzero(other >= 0)
+            index = other[has]
+            near = numpy.zeros(len(x), dtype=bool)
+            near[has] = (px[index] - x[has]) ** 2 + (py[index] - y[has]) ** 2 < min_sq
+            other = batch[gy + oy, gx + ox]
+            has = numpy.flatnonzero((other >= 0) & (other < order))
+            index = other[has]
+            near[has] |= (x[index] - x[has]) ** 2 + (y[index] - y[has]) ** 2 < min_sq
+            ok &= ~near
+        x, y, gx, gy = x[ok], y[ok], gx[ok], gy[ok]
+
+        take = min(len(x), count - accepted)
+        px[accepted:accepted + take] = x[:take]
+        py[accepted:accepted + take] = y[:take]
+        grid[gy[:take], gx[:take]] = numpy.arange(accepted, accepted + take)
+        accepted += take
+        stalled = 0 if take > POISSON_MIN_YIELD * candidates.shape[1] else stalled + 1
+    return cx - radius + px[:accepted], cy - radius + py[:accepted]
+
+
+# One PropBatch per prop template. count_scale multiplies every template's spray_count. With min_spacing, a batch can
+# hold fewer props than that, if its template's square fills up first. (See spray_poisson().)
+def spray_props(count_scale: float = 1.0, min_spacing: float = 0.0) -> list[PropBatch]:
+    rng = numpy.random.default_rng(random.getrandbits(64))
+    batches = []
+    for prop_t in ent.prop_templates:
+        count = round(prop_t['spray_count'] * count_scale)
+        if min_spacing > 0:
+            x, y = spray_poisson(rng, prop_t['x'], prop_t['y'], prop_t['spray_radius'], count, min_spacing)
+        else:
+            x, y = spray_uniform(rng, prop_t['x'], prop_t['y'], prop_t['spray_radius'], count)
+        batches.append(PropBatch(prop_t['name'], assets.prop_template_key(prop_t), x, y))
+    return batches
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun propspray.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
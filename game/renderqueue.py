@@ -0,0 +1,46 @@
+# renderqueue.py
+
+import sys
+from typing import Iterable
+import pygame
+
+
+# ################################################    RENDER QUEUE    ##################################################
+
+# Group.draw() runs a Python loop per group and per sprite. The RenderQueue instead gathers the (surface, position)
+# pairs of every group for the whole frame into one list, in layer order (whatever order the groups are pushed in),
+# and hands that list to ONE Surface.fblits() call at submit(), so the per-sprite loop runs in C.
+# fblits() only takes (surface, dest) pairs. Sequences with (surface, dest, area) items, such as atlas.TextureAtlas
+# blit sequences, are pushed with fast=False and the whole frame then goes through blits() instead. (Still one call.)
+
+class RenderQueue:
+    def __init__(self):
+        self.sequence: list[tuple] = []
+        self.fast: bool = True  # Every queued item is a (surface, dest) pair, so fblits() can take them.
+        self.submitted: int = 0  # Blits in the last submit().
+
+    def push(self, sprites: Iterable[pygame.sprite.Sprite]) -> None:
+        self.sequence += [(sprite.image, sprite.rect) for sprite in sprites]
+
+    # A ready-made blit sequence. fast=True only if it holds nothing but (surface, dest) pairs.
+    def push_sequence(self, sequence: list[tuple], fast: bool = False) -> None:
+        self.sequence += sequence
+        self.fast = self.fast and fast
+
+    def submit(self, target: pygame.Surface) -> None:
+        if self.fast:
+            target.fblits(self.sequence)
+        else:
+            target.blits(self.sequence, doreturn=False)
+        self.submitted = len(self.sequence)
+        self.sequence = []
+        self.fast = True
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun renderqueue.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
@@ -0,0 +1,147 @@
+# replay.py
+
+import sys
+import hashlib
+import struct
+from typing import Iterable
+import pygame
+import inputsource
+
+
+# ###############################################    RECORD / REPLAY    ################################################
+
+# Everything that makes one session differ from the next, captured in a small binary log so the exact same session can
+# be run again: the random seed (the prop spray, meatball positions and spawn pauses come from 'random'), and per frame
+# the frame time and the game key states. Timers (meatball spawning, cooldowns) run on simulated time (main.SCHED), so
+# the frame times alone reproduce them. Recorder wraps the live input source and writes the log. Replayer is an input
+# source that plays it back: the Player reads the recorded keys through it as usual and the main loop takes the frame
+# time from it instead of the clock. With the same seed, the same frame times and the same inputs, the simulation comes
+# out the same, so a replay is a repeatable benchmark scenario. On close, the recorder stores a digest of the final
+# simulation state (every sprite's position) and the replayer checks its own result against it, which shows whether a
+# change (an optimization, say) altered what the simulation does. The digest is exact: a change that only reorders
+# floating point math (e.g. ENTITY_STORE_ENABLE, which moves sprites with NumPy) reports a difference too, even though
+# positions agree to well under a pixel.
+#
+# LOG FORMAT (little-endian)
+#     header:  MAGIC | seed u64 | key count u16 | key codes u32 * key count
+#     frame:   b'F' | frame time f64 | held keys mask u32 | just pressed mask u32
+#     trailer: b'E' | frames u32 | sha1 state digest (20 bytes)
+# The key masks have one bit per recorded key code, in header order.
+# Version 1 logs also had per-frame timer event counts (meatballs came from a pygame timer.) They cannot be replayed.
+
+MAGIC_PREFIX = b'PYAREPL'
+MAGIC = MAGIC_PREFIX + b'2'  # The last byte is the format version.
+GAME_KEYS: tuple[int, ...] = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_SPACE)
+FRAME = struct.Struct('<dII')
+
+
+def key_mask(keys, codes: tuple[int, ...]) -> int:
+    mask = 0
+    for bit, code in enumerate(codes):
+        if keys[code]:
+            mask |= 1 << bit
+    return mask
+
+
+def mask_keys(mask: int, codes: tuple[int, ...]) -> inputsource.KeySet:
+    return inputsource.KeySet(frozenset(code for bit, code in enumerate(codes) if mask >> bit & 1))
+
+
+# Digest of the simulation state: every sprite's type and exact position, in group order.
+def state_digest(sprites: Iterable[pygame.sprite.Sprite]) -> bytes:
+    digest = hashlib.sha1()
+    for sprite in sprites:
+        digest.update(type(sprite).__name__.encode())
+        digest.update(struct.pack('<dd', *sprite.rect.center))
+    return digest.digest()
+
+
+class Recorder:
+    def __init__(self, source, path: str, seed: int, keys: tuple[int, ...] = GAME_KEYS):
+        self.source = source  # The input source being recorded. Normally inputsource.LiveInput.
+        self.keys = keys
+        self.frames: int = 0
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC + struct.pack('<QH', seed, len(keys)) + struct.pack(f'<{len(keys)}I', *keys))
+        self.pressed = inputsource.NO_KEYS
+        self.just_pressed = inputsource.NO_KEYS
+        self.masks: tuple[int, int] = (0, 0)  # (held, just pressed) as the simulation saw them this frame.
+
+    def poll(self) -> None:
+        self.source.poll()
+        self.pressed = self.source.pressed
+        self.just_pressed = self.source.just_pressed
+        self.masks = (key_mask(self.pressed, self.keys), key_mask(self.just_pressed, self.keys))
+
+    def consume(self) -> None:
+        self.source.consume()
+        self.just_pressed = self.source.just_pressed
+
+    # Call once per frame, after the event loop, with the frame time that was used.
+    def end_frame(self, delta_time: float) -> None:
+        self.file.write(b'F' + FRAME.pack(delta_time, *self.masks))
+        self.frames += 1
+
+    def close(self, digest: bytes) -> None:
+        self.file.write(b'E' + struct.pack('<I', self.frames) + digest)
+        self.file.close()
+
+
+class Replayer:
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            if data[:len(MAGIC_PREFIX)] == MAGIC_PREFIX:
+                raise ValueError(f"FATAL: '{path}' is a replay log of an older format. Re-record it.")
+            raise ValueError(f"FATAL: '{path}' is not a replay log.")
+        offset = len(MAGIC)
+        self.seed, key_count = struct.unpack_from('<QH', data, offset)
+        offset += 10
+        self.keys: tuple[int, ...] = struct.unpack_from(f'<{key_count}I', data, offset)
+        offset += 4 * key_count
+
+        # Decode all frames up front, so playback does no parsing.
+        self.frame_log: list[tuple[float, inputsource.KeySet, inputsource.KeySet]] = []
+        while data[offset:offset + 1] == b'F':
+            delta_time, held, just = FRAME.unpack_from(data, offset + 1)
+            offset += 1 + FRAME.size
+            self.frame_log.append((delta_time, mask_keys(held, self.keys), mask_keys(just, self.keys)))
+        self.expected_digest: bytes | None = None  # None if the recording was cut short (no trailer.)
+        if data[offset:offset + 1] == b'E':
+            self.expected_digest = data[offset + 5:offset + 25]
+
+        self.matched: bool | None = None  # Set by verify().
+        self.frame: int = -1
+        self.delta_time: float = 0.0
+        self.pressed = inputsource.NO_KEYS
+        self.just_pressed = inputsource.NO_KEYS
+
+    @property
+    def finished(self) -> bool:
+        return self.frame + 1 >= len(self.frame_log)
+
+    def poll(self) -> None:
+        self.frame += 1
+        self.delta_time, self.pressed, self.just_pressed = self.frame_log[self.frame]
+
+    def consume(self) -> None:
+        self.just_pressed = inputsource.NO_KEYS
+
+    # True/False if the final state matches/differs from the recording. None if the recording has no digest or the
+    # replay was stopped before the end.
+    def verify(self, digest: bytes) -> bool | None:
+        if self.expected_digest is None or not self.finished:
+            self.matched = None
+        else:
+            self.matched = digest == self.expected_digest
+        return self.matched
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun replay.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
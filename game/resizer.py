@@ -2,40 +2,54 @@
 
 import sys
 # import config as cfg  # TODO: Implement use of cfg.DEBUG flag.
-import cv2
 import numpy
+# NOTE: cv2 is imported by the functions below on first use. Loading OpenCV is one of the slowest parts of startup and
+# most runs never resize anything (no spec with 'resize': True, or all resized images come from the asset bundle.)
 
 # Takes the raw bytes of a PNG image with alpha channel and optimally resizes it, preserving transparency properly.
-# Returns the raw bytes of a PNG image with alpha channel, now at the new size. (Shape of third dimension is always 4.)
-def alphonic_resize(img_data: bytes, width: int, height: int) -> bytes:
-    numpy_array = numpy.fromstring(img_data, dtype=numpy.uint8, sep='')  # Decode bytes as UInt8 thanks to numpy utility.
-    img_numpy = cv2.imdecode(numpy_array, cv2.IMREAD_UNCHANGED)
-    # print(f"alphonic_resize - after numpy.fromstring AND cv2.imdecode - original size: img_numpy.shape: {img_numpy.shape}")
-    new_size = (width, height)
+# Returns the raw RGBA pixels at the new size as a C-contiguous numpy array of shape (height, width, 4), dtype uint8.
+# Nothing is encoded and nothing touches the filesystem. The array supports the buffer protocol, so the caller can hand
+# it straight to pygame.image.frombuffer(rgba, (width, height), 'RGBA') without another copy.
+def alphonic_resize(img_data: bytes, width: int, height: int) -> numpy.ndarray:
+    return alphonic_resize_many(img_data, [(width, height)])[0]
 
+
+# BATCH RESIZE - As alphonic_resize(), for many target sizes at once. The PNG is decoded only once and every size is
+# resized from the full decoded image. Returns one RGBA array per size, in the same order.
+def alphonic_resize_many(img_data: bytes, sizes: list[tuple[int, int]]) -> list[numpy.ndarray]:
+    bgr, alpha = decode_layers(img_data)
+    return [merge_layers(*resize_layers(bgr, alpha, size)) for size in sizes]
+
+
+# The decoded image as separate BGR and alpha layers, so they can be resized separately.
+def decode_layers(img_data: bytes) -> tuple[numpy.ndarray, numpy.ndarray]:
+    import cv2  # Lazy. See the NOTE above. (Only the first call pays for the import.)
+    numpy_array = numpy.frombuffer(img_data, dtype=numpy.uint8)  # View the bytes as UInt8. (No copy, unlike fromstring.)
+    img_numpy = cv2.imdecode(numpy_array, cv2.IMREAD_UNCHANGED)  # NOTE: OpenCV channel order is BGR(A), not RGB(A).
+    return img_numpy[:,:,:3], img_numpy[:,:,3]
+
+
+def resize_layers(bgr: numpy.ndarray, alpha: numpy.ndarray,
+                  new_size: tuple[int, int]) -> tuple[numpy.ndarray, numpy.ndarray]:
+    import cv2
     # # Resize the rgb and alpha layers separately and with the optimal algorithm for each.
     # rgb = cv2.resize(img_numpy[:,:,:3], new_size, interpolation=cv2.INTER_AREA)  # ORIGINAL
-    rgb = cv2.resize(img_numpy[:,:,:3], new_size, interpolation=cv2.INTER_LINEAR)
+    bgr = cv2.resize(bgr, new_size, interpolation=cv2.INTER_LINEAR)
     # alpha = cv2.resize(img_numpy[:,:,3], new_size, interpolation=cv2.INTER_NEAREST)  # ORIGINAL
-    alpha = cv2.resize(img_numpy[:,:,3], new_size, interpolation=cv2.INTER_LINEAR)
+    alpha = cv2.resize(alpha, new_size, interpolation=cv2.INTER_LINEAR)
 
     # For resizing larger (grumpy cat test) INTER_LINEAR works well. INTER_CUBIC works similarly.
     # TODO: Add a sharpen (unsharp mask) step if possible. Ususally an improvement after resizing which tends to add fuzziness.
+    return bgr, alpha
 
-    # # Merge the layers back together again.
-    rgba = cv2.cvtColor(rgb, cv2.COLOR_RGB2RGBA)
-    rgba[:, :, 3] = alpha
-
-    # Using this temp file hack until I can more cleanly get the raw image (PNG file) bytes out of the cv2 image.
-    cv2.imwrite('alphonic-resize-temp-png.png', rgba)
-    with open('alphonic-resize-temp-png.png', 'rb') as fh:
-        img_bytes_out: bytes = fh.read()
 
-
-    out_numpy_array = numpy.fromstring(img_bytes_out, dtype=numpy.uint8, sep='')  # For debug logging only for now.
-    out_img_numpy = cv2.imdecode(out_numpy_array, cv2.IMREAD_UNCHANGED)  # For debug logging only for now.
-    # print(f"alphonic_resize - after resize - returned size: out_img_numpy.shape: {out_img_numpy.shape}")
-    return img_bytes_out
+def merge_layers(bgr: numpy.ndarray, alpha: numpy.ndarray) -> numpy.ndarray:
+    import cv2
+    # # Merge the layers back together again. BGR2RGBA swaps to pygame's channel order and allocates a fresh contiguous
+    # array, which we then fill with the separately resized alpha.
+    rgba = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGBA)
+    rgba[:, :, 3] = alpha
+    return rgba
 
     # Everything works but looks like we might have a black line around the very edgy (somewhat known issue.)
 
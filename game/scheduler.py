@@ -0,0 +1,114 @@
+# scheduler.py
+
+import sys
+import heapq
+import itertools
+import random
+from typing import Callable
+
+
+# ##################################################    SCHEDULER    ###################################################
+
+# One central timer queue for everything timed in the game: cooldowns, spawners and the like. Timers are kept in a heap
+# ordered by due time, and the main loop calls advance() with the current simulated time once per simulation step.
+# advance() only ever looks at the timers that are due, so a step costs O(expired timers * log n), however many timers
+# are waiting: nothing polls a clock per entity, and thousands of timed behaviours cost nothing until they fire.
+#     after(delay, callback, *args) - one-shot.
+#     every(interval, callback, *args, jitter=0) - repeating. With jitter, each period is interval plus a fresh random
+#         0..jitter, drawn from 'random' (so a seeded run or a replay draws the same periods.)
+#     cancel(timer) - The heap entry is only marked. Marked entries are skipped when they come up, and the heap is
+#         compacted once they are more than half of it.
+# Times are in milliseconds of SIMULATED time (see g_sim_time_ms in main.py), so timers behave the same whether frames
+# are measured, fixed (bench.py) or replayed. A repeating timer is rescheduled from its due time, not from the time
+# advance() ran, so it does not drift. If a step covers several periods, it fires once per period, in order.
+
+COMPACT_MIN: int = 64  # Cancelled entries tolerated in the heap before compaction is considered at all.
+
+
+class Timer:
+    __slots__ = ('due', 'interval', 'jitter', 'callback', 'args', 'active')
+
+    def __init__(self, due: float, interval: float, jitter: float, callback: Callable, args: tuple):
+        self.due: float = due
+        self.interval: float = interval  # 0 for a one-shot.
+        self.jitter: float = jitter
+        self.callback: Callable = callback
+        self.args: tuple = args
+        self.active: bool = True  # False once cancelled, or once a one-shot has fired.
+
+    def period(self) -> float:
+        return self.interval + random.random() * self.jitter if self.jitter else self.interval
+
+
+class Scheduler:
+    def __init__(self):
+        self.now: float = 0.0  # Time of the last advance().
+        self.heap: list[tuple[float, int, Timer]] = []  # (due, sequence, timer). Sequence: same due fires in order.
+        self.sequence = itertools.count()
+        self.cancelled: int = 0  # Marked entries still in the heap.
+        self.scheduled: int = 0
+        self.fired: int = 0
+
+    def _push(self, timer: Timer) -> Timer:
+        heapq.heappush(self.heap, (timer.due, next(self.sequence), timer))
+        self.scheduled += 1
+        return timer
+
+    def after(self, delay: float, callback: Callable, *args) -> Timer:
+        return self._push(Timer(self.now + delay, 0.0, 0.0, callback, args))
+
+    def every(self, interval: float, callback: Callable, *args, jitter: float = 0.0) -> Timer:
+        if interval <= 0 or jitter < 0:
+            raise ValueError(f"FATAL: Invalid repeating timer interval {interval} (jitter {jitter}). "
+                             "The interval must be > 0 and the jitter >= 0.")
+        timer = Timer(0.0, interval, jitter, callback, args)
+        timer.due = self.now + timer.period()
+        return self._push(timer)
+
+    def cancel(self, timer: Timer) -> None:
+        if not timer.active:
+            return
+        timer.active = False
+        self.cancelled += 1
+        if self.cancelled > COMPACT_MIN and self.cancelled > len(self.heap) // 2:
+            # In place: advance() may be looping over this very list (a callback cancelling timers.)
+            self.heap[:] = [entry for entry in self.heap if entry[2].active]
+            heapq.heapify(self.heap)
+            self.cancelled = 0
+
+    # Fires every timer due at or before now, in due order. Callbacks may schedule or cancel timers, even their own.
+    def advance(self, now: float) -> None:
+        self.now = now
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            _, _, timer = heapq.heappop(heap)
+            if not timer.active:
+                self.cancelled -= 1
+                continue
+            if timer.interval:
+                timer.due += timer.period()
+                heapq.heappush(heap, (timer.due, next(self.sequence), timer))
+            else:
+                timer.active = False
+            self.fired += 1
+            timer.callback(*timer.args)
+
+    # Timers waiting to fire. (Cancelled ones not included.)
+    def pending(self) -> int:
+        return len(self.heap) - self.cancelled
+
+    def stats(self) -> dict:
+        return {
+            'pending': self.pending(),
+            'scheduled': self.scheduled,
+            'fired': self.fired,
+        }
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun scheduler.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
@@ -0,0 +1,220 @@
+# shardsim.py
+
+import sys
+import atexit
+import multiprocessing
+import signal
+from multiprocessing import shared_memory
+import numpy
+import config as cfg
+import entitystore
+
+
+# ###########################################    SHARDED SIMULATION    ###############################################
+
+# For crowds too big for one core, even vectorized. The ShardedEntityStore is an EntityStore whose arrays live in one
+# multiprocessing.shared_memory block, moved by worker processes instead of the main process. The world is split into
+# vertical strips (regions), one per worker. Each slot has an owner region, and the slots of a region are kept
+# CONTIGUOUS, in region order: region r owns slots bounds[r] to bounds[r + 1]. So per step, every worker runs the same
+# motion rules as the EntityStore (entitystore.move_and_bounce()) in place on array views of its own range, with no
+# copying, and writes back the region each of them is in afterwards. That is the HANDOFF: once the step is done, the
+# store copies those regions into the owner array, and before the next step regroup() moves the (few) slots that are
+# now in the wrong range, so an entity that crossed a strip boundary is moved by the neighbouring worker from then on.
+# (Handing off after the step, not during it, means no entity is ever moved by two workers in the same step.)
+# The main process only adds, removes, retargets and regroups slots between steps, and reads the arrays to write the
+# results back to the sprites for rendering, exactly like the EntityStore (view culling included.) It starts a step by
+# releasing every worker's 'go' semaphore and waits for as many releases of the shared 'done' semaphore, so nobody
+# ever reads a half-written array.
+# Workers are started on the first update() and stopped by close() (also registered with atexit.) The shared block has
+# a fixed capacity, since workers cannot follow a reallocation.
+
+SHARD_FIELDS: tuple[tuple[str, type], ...] = entitystore.FIELDS + (
+    ('owner', numpy.int16),  # Region (worker) that moves this slot.
+    ('handoff', numpy.int16),  # Region the slot is in after the last step. Becomes the owner once the step is done.
+    ('flags', numpy.int8),  # FLAG_* results of the last step.
+)
+FLAG_BOUNCED: int = 1
+FLAG_FINALIZED: int = 2
+STEP_TIMEOUT: float = 10.0  # Seconds. A worker that died or hung fails the step instead of freezing the game.
+
+
+# Byte offsets of every array in the shared block: the control words first, then one array per field.
+def shared_layout(capacity: int, regions: int) -> tuple[dict[str, tuple[type, int, int]], int]:
+    layout = {}
+    offset = 0
+    header = (('control', numpy.int64, 1), ('delta_time', numpy.float64, 1), ('bounds', numpy.int64, regions + 1))
+    for name, dtype, length in header + tuple((name, dtype, capacity) for name, dtype in SHARD_FIELDS):
+        layout[name] = (dtype, offset, length)
+        offset += -(-length * numpy.dtype(dtype).itemsize // 8) * 8  # Keep every array 8-byte aligned.
+    return layout, offset
+
+
+def shared_arrays(buffer, capacity: int, regions: int) -> dict[str, numpy.ndarray]:
+    layout, _ = shared_layout(capacity, regions)
+    return {name: numpy.ndarray(length, dtype=dtype, buffer=buffer, offset=offset)
+            for name, (dtype, offset, length) in layout.items()}
+
+
+def region_of(x, regions: int, world_width: float):
+    return numpy.clip(numpy.floor(numpy.asarray(x) * regions / world_width), 0, regions - 1).astype(numpy.int16)
+
+
+def shard_worker(shm_name: str, capacity: int, region: int, regions: int, world_width: float, world_height: float,
+                 margin: float, go, done) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C is for the main process, which then stops the workers.
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = shared_arrays(shm.buf, capacity, regions)
+    control, delta_time, bounds = arrays['control'], arrays['delta_time'], arrays['bounds']
+    x, y, dx, dy, speed = arrays['x'], arrays['y'], arrays['dx'], arrays['dy'], arrays['speed']
+    half_w, half_h, walls = arrays['half_w'], arrays['half_h'], arrays['walls']
+    handoff, flags = arrays['handoff'], arrays['flags']
+    try:
+        while True:
+            go.acquire()  # START of step. (Or stop.)
+            if control[0]:
+                break
+            mine = slice(int(bounds[region]), int(bounds[region + 1]))
+            if mine.stop > mine.start:
+                bounced, finalized = entitystore.move_and_bounce(
+                        x[mine], y[mine], dx[mine], dy[mine], speed[mine], half_w[mine], half_h[mine], walls[mine],
+                        float(delta_time[0]), world_width, world_height, margin)
+                flags[mine] = bounced * FLAG_BOUNCED | finalized * FLAG_FINALIZED
+                handoff[mine] = region_of(x[mine], regions, world_width)
+            done.release()  # END of step.
+    finally:
+        del x, y, dx, dy, speed, half_w, half_h, walls, handoff, flags, control, delta_time, bounds
+        arrays.clear()  # No views may remain on the buffer when it is closed.
+        shm.close()
+
+
+class ShardedEntityStore(entitystore.EntityStore):
+    def __init__(self, workers: int, capacity: int = 65536, heading_steps: int = 0):
+        self.workers: int = workers  # One region (vertical world strip) per worker.
+        self.shm: shared_memory.SharedMemory | None = None
+        self.arrays: dict[str, numpy.ndarray] = {}
+        self.processes: list[multiprocessing.Process] = []
+        self.go: list = []  # One semaphore per worker, released to start a step.
+        self.done = None  # Released by every worker once its part of the step is done.
+        self.world_width: float = cfg.WORLD_WIDTH
+        self.steps: int = 0
+        self.handoffs: int = 0
+        self.regrouped: int = 0  # Slots moved by regroup().
+        super().__init__(capacity, heading_steps)
+        self.fields = SHARD_FIELDS
+        for name, _ in SHARD_FIELDS[len(entitystore.FIELDS):]:
+            setattr(self, name, self.arrays[name])
+
+    def _allocate(self, capacity: int) -> None:
+        _, size = shared_layout(capacity, self.workers)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.arrays = shared_arrays(self.shm.buf, capacity, self.workers)
+        self.arrays['control'][:] = 0
+        self.arrays['bounds'][:] = 0
+        for name, _ in entitystore.FIELDS:
+            setattr(self, name, self.arrays[name])
+
+    def _grow(self) -> None:
+        raise RuntimeError(f"FATAL: Sharded entity store is full ({len(self.x)} slots). Raise cfg.SHARD_CAPACITY.")
+
+    def add(self, sprite, walls: int) -> None:
+        super().add(sprite, walls)  # Appended, so maybe outside its region's range. The next regroup() moves it.
+        i = self.count - 1
+        self.owner[i] = self.handoff[i] = region_of(self.x[i], self.workers, self.world_width)
+
+    # Makes the slots of every region contiguous again, in region order, and sets the bounds of the ranges. Only slots
+    # in the wrong range move: after a step that is about twice the handoffs (and adds and removes), not a re-sort.
+    def regroup(self) -> None:
+        n = self.count
+        owner = self.owner[:n]
+        bounds = self.arrays['bounds']
+        numpy.cumsum(numpy.bincount(owner, minlength=self.workers), out=bounds[1:])
+        expected = numpy.repeat(numpy.arange(self.workers, dtype=numpy.int16), numpy.diff(bounds))
+        misplaced = numpy.flatnonzero(owner != expected)
+        if misplaced.size == 0:
+            return
+        # A region has as many slots outside its range as its range has slots of other regions. Sorting both lists by
+        # region pairs them up.
+        sources = misplaced[numpy.argsort(owner[misplaced], kind='stable')]
+        targets = misplaced[numpy.argsort(expected[misplaced], kind='stable')]
+        for name, _ in self.fields:
+            arr = getattr(self, name)
+            arr[targets] = arr[sources]
+        sprites = self.sprites
+        moved = [sprites[i] for i in sources.tolist()]
+        for i, sprite in zip(targets.tolist(), moved):
+            sprites[i] = sprite
+            sprite.store_index = i
+        self.regrouped += len(moved)
+
+    def start(self) -> None:
+        context = multiprocessing.get_context()
+        self.go = [context.Semaphore(0) for _ in range(self.workers)]
+        self.done = context.Semaphore(0)
+        for region in range(self.workers):
+            process = context.Process(
+                    target=shard_worker,
+                    args=(self.shm.name, len(self.x), region, self.workers, self.world_width, cfg.WORLD_HEIGHT,
+                          cfg.PROJECTILE_MARGIN, self.go[region], self.done),
+                    name=f'shard-{region}',
+                    daemon=True,
+                )
+            process.start()
+            self.processes.append(process)
+        atexit.register(self.close)
+
+    def step(self, delta_time: float) -> tuple[numpy.ndarray, numpy.ndarray]:
+        if not self.processes:
+            self.start()
+        self.regroup()
+        self.arrays['delta_time'][0] = delta_time
+        for go in self.go:
+            go.release()
+        for _ in range(self.workers):
+            if not self.done.acquire(timeout=STEP_TIMEOUT):
+                raise RuntimeError(f"FATAL: A shard worker did not finish its step within {STEP_TIMEOUT} seconds.")
+        n = self.count
+        moved = self.handoff[:n] != self.owner[:n]
+        self.handoffs += int(numpy.count_nonzero(moved))
+        self.owner[:n] = self.handoff[:n]
+        self.steps += 1
+        flags = self.flags[:n]
+        return (flags & FLAG_BOUNCED) != 0, (flags & FLAG_FINALIZED) != 0
+
+    def close(self) -> None:
+        if self.processes:
+            self.arrays['control'][0] = 1  # Stop.
+            for go in self.go:
+                go.release()
+            for process in self.processes:
+                process.join(STEP_TIMEOUT)
+                if process.is_alive():
+                    process.terminate()
+            self.processes = []
+        if self.shm is not None:
+            for name, _ in SHARD_FIELDS:
+                setattr(self, name, None)
+            self.arrays.clear()  # No views may remain on the buffer when it is closed.
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def stats(self) -> dict:
+        n = self.count
+        return {
+            'workers': self.workers,
+            'entities': n,
+            'capacity': len(self.flags) if self.shm is not None else 0,
+            'per_region': numpy.bincount(self.owner[:n], minlength=self.workers).tolist() if self.shm is not None else [],
+            'steps': self.steps,
+            'handoffs': self.handoffs,
+            'regrouped': self.regrouped,
+        }
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun shardsim.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
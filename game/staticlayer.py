@@ -0,0 +1,74 @@
+# staticlayer.py
+
+import sys
+import numpy
+import pygame
+
+
+# #############################################    STATIC PROP LAYER    ################################################
+
+# Props never move, yet drawing them the normal way means walking every prop sprite every frame, right after the full
+# background blit. The StaticLayer instead renders the background plus all props ONCE into a single convert()ed,
+# screen-sized surface. The main loop then does one blit per frame no matter how many props there are.
+# The layer is only re-baked when props are added to or removed from the StaticPropGroup, which notices membership
+# changes itself, so nothing has to remember to invalidate it.
+# Batches of sprayed props (see propspray.py) can also be baked in directly with add_batch(), without ever becoming
+# Prop sprites. They are drawn below the props in the group.
+
+class StaticPropGroup(pygame.sprite.Group):
+    def __init__(self, *sprites):
+        self.dirty: bool = True  # Membership changed since the last bake. (Set before super().__init__ adds sprites.)
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.dirty = True
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.dirty = True
+
+
+class StaticLayer:
+    def __init__(self, background: pygame.Surface, props: StaticPropGroup, size: tuple[int, int]):
+        self.background = background
+        self.props = props
+        self.size = size
+        self.layer: pygame.Surface = pygame.Surface(size).convert()
+        self.batches: list[tuple[pygame.Surface, numpy.ndarray, numpy.ndarray]] = []  # (image, center X, center Y)
+        self.bakes: int = 0
+
+    # Returns the baked layer, re-baking first only if the prop membership changed.
+    def surface(self) -> pygame.Surface:
+        if self.props.dirty:
+            self.bake()
+        return self.layer
+
+    @property
+    def dirty(self) -> bool:
+        return self.props.dirty
+
+    def bake(self) -> None:
+        self.layer.blit(self.background, (0, 0))
+        for image, xs, ys in self.batches:  # Placed exactly like a Prop sprite's rect would place them.
+            self.layer.fblits([(image, image.get_frect(center=center)) for center in zip(xs.tolist(), ys.tolist())])
+        self.layer.fblits([(sprite.image, sprite.rect) for sprite in self.props])  # One C-level call for all props.
+        self.props.dirty = False
+        self.bakes += 1
+
+    def add_batch(self, image: pygame.Surface, xs: numpy.ndarray, ys: numpy.ndarray) -> None:
+        self.batches.append((image, xs, ys))
+        self.props.dirty = True
+
+    def set_background(self, background: pygame.Surface) -> None:
+        self.background = background
+        self.props.dirty = True
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun staticlayer.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
@@ -0,0 +1,125 @@
+# streamloader.py
+
+import sys
+import itertools
+import queue
+import threading
+import time
+from typing import Callable, Iterator
+import pygame
+from assets import ImageKey
+
+
+# ##############################################    STREAMING LOADER    ################################################
+
+# Loads images on background threads while the game keeps running. Images are requested with a priority (lower loads
+# first), so what the game needs to start (the player, its weapons) is decoded before the NPCs, props and background.
+# Worker threads only do the display-independent part (file read, decode, resize - see assets.decode_surface().) The
+# finished raw surfaces are handed back to the main thread by poll(), which stops handing out results once its time
+# budget for the frame is used up, so the main thread's part (convert_alpha, flips) never causes a hitch, no matter how
+# much finishes at once. Whatever is not ready yet is drawn with a placeholder. Sprites showing a placeholder register
+# with wait() and the caller swaps their images when the real one arrives (see waiters.)
+# A request for an image that is already queued with a lower priority moves it up. Requests can come at any time,
+# e.g. for assets first needed mid-game.
+
+PRIORITY_PLAYER: int = 0
+PRIORITY_WEAPON: int = 1
+PRIORITY_NPC: int = 2
+PRIORITY_PROP: int = 3
+PRIORITY_BACKGROUND: int = 4
+PRIORITY_LAST: int = 5  # Anything else.
+PRIORITY_STOP: int = -1  # Internal. Sorts before any request, so close() does not wait for the queue to drain.
+
+
+class StreamingLoader:
+    def __init__(self, decode: Callable[[ImageKey], pygame.Surface], workers: int = 2):
+        self.decode = decode  # Called on a worker thread. Must not touch the display.
+        self.requests: queue.PriorityQueue[tuple[int, int, ImageKey | None]] = queue.PriorityQueue()
+        # (key, raw Surface or None, error or None), from the workers to poll().
+        self.results: queue.SimpleQueue[tuple[ImageKey, pygame.Surface | None, BaseException | None]] = \
+            queue.SimpleQueue()
+        self.sequence = itertools.count()  # Tie-breaker: same priority loads in request order.
+        self.priorities: dict[ImageKey, int] = {}  # Requested and not delivered yet.
+        self.taken: set[ImageKey] = set()  # Being decoded by a worker, or decoded and not delivered yet.
+        self.lock = threading.Lock()
+        self.waiters: dict[ImageKey, list] = {}  # Sprites showing a placeholder, per image they wait for.
+        self.requested: int = 0
+        self.delivered: int = 0
+        self.threads: list[threading.Thread] = [
+            threading.Thread(target=self.work, name=f'stream-{i}', daemon=True) for i in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def request(self, key: ImageKey, priority: int = PRIORITY_LAST) -> None:
+        with self.lock:
+            if key in self.taken or self.priorities.get(key, priority + 1) <= priority:
+                return  # Already being decoded, or already queued at this priority or better.
+            if key not in self.priorities:
+                self.requested += 1
+            self.priorities[key] = priority
+        self.requests.put((priority, next(self.sequence), key))
+
+    def wait(self, key: ImageKey, sprite) -> None:
+        self.waiters.setdefault(key, []).append(sprite)
+
+    def work(self) -> None:
+        while True:
+            _, _, key = self.requests.get()
+            if key is None:
+                return
+            with self.lock:
+                if key in self.taken or key not in self.priorities:
+                    continue  # A duplicate entry left behind by a priority bump.
+                self.taken.add(key)
+            try:
+                self.results.put((key, self.decode(key), None))
+            except Exception as error:  # Re-raised on the main thread by poll().
+                self.results.put((key, None, error))
+
+    # Yields (key, raw Surface) for finished images, until budget_seconds have passed. At least one result is always
+    # handed out if one is ready, so loading progresses even with a tiny budget.
+    def poll(self, budget_seconds: float) -> Iterator[tuple[ImageKey, pygame.Surface]]:
+        deadline = time.perf_counter() + budget_seconds
+        while True:
+            try:
+                key, raw_surface, error = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if error is not None:
+                raise RuntimeError(f"FATAL: Streaming load of {key} failed.") from error
+            with self.lock:
+                del self.priorities[key]
+                self.taken.discard(key)  # (It can be requested again, e.g. after SCACHE evicted it.)
+            self.delivered += 1
+            yield key, raw_surface
+            if time.perf_counter() >= deadline:
+                return
+
+    # Images still to come, at up to this priority.
+    def pending(self, max_priority: int = PRIORITY_LAST) -> int:
+        with self.lock:
+            return sum(1 for priority in self.priorities.values() if priority <= max_priority)
+
+    def close(self) -> None:
+        for _ in self.threads:
+            self.requests.put((PRIORITY_STOP, next(self.sequence), None))
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def stats(self) -> dict:
+        return {
+            'requested': self.requested,
+            'delivered': self.delivered,
+            'pending': self.pending(),
+            'waiting_sprites': sum(len(sprites) for sprites in self.waiters.values()),
+        }
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun streamloader.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
@@ -0,0 +1,121 @@
+# surfcache.py
+
+import sys
+import collections
+from typing import Callable, Hashable, TypedDict
+import pygame
+from assets import ImageKey
+
+
+# ###############################################    SURFACE CACHE    ##################################################
+
+# SURFACE CACHE
+# Pre-loaded images as surfaces, so sprites never load from disk when they are instantiated. This is important for
+# dynamically/frequently spawned/destroyed sprites. Items are keyed by the full ImageKey (filename, flip, resize, w, h)
+# since each combination is a distinct processed image. Every variant is loaded exactly once, on the first request,
+# and later requests for the same key are hits. With a byte budget set, the least-recently-used items are evicted once
+# the resident size goes over budget, and simply reloaded if they are requested again. Sprites that already hold an
+# evicted surface keep it alive (and drawable) on their own. Eviction only drops the cache's reference.
+# The same byte-budgeted LRU holds the sprite variants (see variants.py.) Those are single Surfaces keyed by variant,
+# rendered by the VariantCache itself, so that cache has no loader and only uses find() and put().
+SurfCacheItem = TypedDict('SurfCacheItem',
+    {
+        'surface_l': pygame.Surface,  # Image as loaded and with 'flip' options and/or 'resize' options applied if True. Should be LEFT facing.
+        'surface_r': pygame.Surface,  # Flipped (assumed to be RIGHT-facing) version of image. Generated by load_image()
+    }
+)  # SurfCacheitem
+
+
+def surface_bytes(surface: pygame.Surface | None) -> int:
+    if surface is None:
+        return 0
+    return surface.get_pitch() * surface.get_height()  # Pixel memory actually held, including row padding.
+
+
+def item_bytes(c_item: SurfCacheItem) -> int:
+    return surface_bytes(c_item['surface_l']) + surface_bytes(c_item['surface_r'])
+
+
+class SurfaceCache:
+    def __init__(self, loader: Callable[[ImageKey], SurfCacheItem] | None = None, budget_bytes: int = 0):
+        self.loader = loader  # Called on a miss. Must return a finished (converted) SurfCacheItem for the key.
+        self.budget_bytes: int = budget_bytes  # 0 means unlimited. No eviction.
+        # Oldest first. Keyed by ImageKey, with SurfCacheItems. (Or by VariantKey, with Surfaces. See variants.py.)
+        self.items: collections.OrderedDict[Hashable, SurfCacheItem | pygame.Surface] = collections.OrderedDict()
+        self.sizes: dict[Hashable, int] = {}  # Resident bytes per item.
+        self.resident_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.generation: int = 0  # Bumped whenever the set of cached surfaces changes. (e.g. to know when to repack.)
+
+    def __contains__(self, key: ImageKey) -> bool:
+        return key in self.items
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def get(self, key: ImageKey) -> SurfCacheItem:
+        c_item = self.find(key)
+        if c_item is None:
+            self.misses += 1
+            c_item = self.loader(key)
+            self.put(key, c_item)
+        return c_item
+
+    # The cached item (a hit) or None. Never loads anything, and a None is not counted as a miss.
+    def find(self, key: Hashable) -> SurfCacheItem | pygame.Surface | None:
+        c_item = self.items.get(key)
+        if c_item is not None:
+            self.hits += 1
+            self.items.move_to_end(key)  # Most recently used.
+        return c_item
+
+    # Insert an item that was produced elsewhere (e.g. by the parallel preload.) Does not count as a hit or a miss.
+    # 'size' overrides the bytes accounted for it, for items whose pixels are already held elsewhere.
+    def put(self, key: Hashable, c_item: SurfCacheItem | pygame.Surface, size: int | None = None) -> None:
+        if key in self.items:
+            self.resident_bytes -= self.sizes[key]
+        self.items[key] = c_item
+        self.items.move_to_end(key)
+        self.sizes[key] = item_bytes(c_item) if size is None else size
+        self.resident_bytes += self.sizes[key]
+        self.generation += 1
+        self.evict()
+
+    # The most recently used item is never evicted, even if it alone is over budget, since it was just asked for.
+    def evict(self) -> None:
+        if not self.budget_bytes:
+            return
+        while self.resident_bytes > self.budget_bytes and len(self.items) > 1:
+            key = next(iter(self.items))  # Least recently used.
+            del self.items[key]
+            self.resident_bytes -= self.sizes.pop(key)
+            self.evictions += 1
+            self.generation += 1
+
+    def stats(self) -> dict:
+        return {
+            'items': len(self.items),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'resident_bytes': self.resident_bytes,
+            'budget_bytes': self.budget_bytes,
+            'generation': self.generation,
+        }
+
+    def report(self) -> str:
+        lines = [f"SCACHE: {self.stats()}"]
+        for key, size in self.sizes.items():
+            lines.append(f"    {key}: {size} bytes")
+        return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun surfcache.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
@@ -0,0 +1,72 @@
+# test_scheduler.py
+
+import unittest
+import scheduler
+
+
+# Run from the game directory: python -m unittest test_scheduler
+
+class SchedulerTest(unittest.TestCase):
+    def test_one_shot_fires_once(self):
+        sched = scheduler.Scheduler()
+        fired = []
+        sched.after(10, fired.append, 'a')
+        sched.advance(9)
+        self.assertEqual(fired, [])
+        sched.advance(10)
+        sched.advance(50)
+        self.assertEqual(fired, ['a'])
+        self.assertEqual(sched.pending(), 0)
+
+    def test_repeating_fires_once_per_period_without_drift(self):
+        sched = scheduler.Scheduler()
+        fired = []
+        timer = sched.every(10, lambda: fired.append(sched.now))
+        sched.advance(35)  # Three periods in one step.
+        self.assertEqual(len(fired), 3)
+        self.assertEqual(timer.due, 40)
+
+    def test_cancel(self):
+        sched = scheduler.Scheduler()
+        fired = []
+        timer = sched.every(1, fired.append, 'x')
+        sched.cancel(timer)
+        sched.advance(5)
+        self.assertEqual(fired, [])
+        self.assertEqual(sched.pending(), 0)
+
+    def test_jitter_stays_in_range(self):
+        sched = scheduler.Scheduler()
+        timer = sched.every(20, lambda: None, jitter=5)
+        for now in range(0, 2000, 7):
+            previous = timer.due
+            sched.advance(now)
+            if timer.due != previous:
+                self.assertTrue(20 <= timer.due - previous <= 25)
+
+    # A callback cancelling enough timers to compact the heap, in the middle of advance().
+    def test_callback_cancels_other_timers(self):
+        sched = scheduler.Scheduler()
+        victims = [sched.after(5, self.fail, 'cancelled timer fired') for _ in range(200)]
+        sched.after(1, lambda: [sched.cancel(victim) for victim in victims])
+        ticks = []
+        repeating = sched.every(1, lambda: ticks.append(sched.now))
+        sched.advance(1)
+        self.assertEqual(ticks, [1])
+        sched.advance(1.5)
+        self.assertEqual(ticks, [1])
+        sched.advance(2)
+        self.assertEqual(ticks, [1, 2])
+        self.assertEqual(repeating.due, 3)
+        sched.advance(10)
+        self.assertEqual(len(ticks), 10)
+        self.assertEqual(sched.pending(), 1)
+        self.assertIs(sched.heap[0][2], repeating)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+##
+#
@@ -0,0 +1,82 @@
+# timestep.py
+
+import sys
+import pygame
+
+
+# ##############################################    FIXED TIMESTEP    ##################################################
+
+# With a variable timestep, the measured frame time goes straight into every update(). A slow frame then moves things
+# a long way in one go (at chaos/frozen phase speeds, far enough to jump past a wall or through another sprite) and the
+# environment phase counters count frames, so phases last longer on slower machines.
+# FixedTimestep decouples the simulation from the render rate: frame time is added to an accumulator and the
+# simulation is stepped by exactly 'step' seconds as many times as the accumulator allows. Whatever is left over
+# (less than one step) carries into the next frame. To survive a long stall (window drag, breakpoint) without a
+# 'spiral of death', at most max_steps are run per frame and any time beyond that is dropped.
+# Interpolator then draws every moving sprite part-way between its position before and after the last step, by the
+# leftover fraction (alpha), so motion looks smooth even when the render rate and the simulation rate do not match.
+
+class FixedTimestep:
+    def __init__(self, rate: int, max_steps: int):
+        self.step: float = 1.0 / rate  # Seconds per simulation step.
+        self.max_steps: int = max_steps
+        self.accumulator: float = 0.0
+        self.steps: int = 0  # Total simulation steps run.
+        self.dropped_seconds: float = 0.0  # Time thrown away by the max_steps limit.
+
+    # Adds one frame's worth of time and returns the number of simulation steps to run now. (Often 0 or 1.)
+    def advance(self, frame_seconds: float) -> int:
+        self.accumulator += frame_seconds
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            self.dropped_seconds += (steps - self.max_steps) * self.step
+            self.accumulator -= (steps - self.max_steps) * self.step
+            steps = self.max_steps
+        self.accumulator -= steps * self.step
+        self.steps += steps
+        return steps
+
+    # How far (0.0 to 1.0) the render time is between the last simulation step and the next one.
+    @property
+    def alpha(self) -> float:
+        return self.accumulator / self.step
+
+
+class Interpolator:
+    def __init__(self, groups: list[pygame.sprite.Group]):
+        self.groups = groups  # Only moving sprites. (Props never move and are left alone.)
+        self.previous: dict[pygame.sprite.Sprite, tuple[float, float]] = {}  # Centers before the last step.
+        self.current: list[tuple[pygame.sprite.Sprite, tuple[float, float]]] = []  # Saved by apply(), for restore().
+
+    # Call right BEFORE the last simulation step of a frame.
+    def snapshot(self) -> None:
+        self.previous = {sprite: sprite.rect.center for group in self.groups for sprite in group}
+
+    # Moves every sprite to its interpolated position for drawing. MUST be followed by restore() after drawing.
+    # Sprites spawned during the last step have no previous position and are drawn where they are.
+    def apply(self, alpha: float) -> None:
+        previous = self.previous
+        current = self.current
+        for group in self.groups:
+            for sprite in group:
+                prev = previous.get(sprite)
+                if prev is None:
+                    continue
+                rect = sprite.rect
+                x, y = rect.center
+                current.append((sprite, (x, y)))
+                rect.center = (prev[0] + (x - prev[0]) * alpha, prev[1] + (y - prev[1]) * alpha)
+
+    def restore(self) -> None:
+        for sprite, center in self.current:
+            sprite.rect.center = center
+        self.current.clear()
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun timestep.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#
@@ -0,0 +1,82 @@
+# variants.py
+
+import sys
+import math
+import pygame
+from assets import ImageKey
+from surfcache import SurfaceCache, surface_bytes
+
+
+# #############################################    SPRITE VARIANT CACHE    #############################################
+
+# Sprites that face their actual heading need a rotated (and possibly scaled) copy of their image for every direction
+# they can face. Rotating every frame would cost a transform per sprite per frame, so headings are quantized into
+# 'angle_steps' buckets (scale into multiples of 'scale_step') and each (image, angle bucket, scale bucket) variant is
+# rendered ONCE, the first time any sprite needs it, then served from the cache. A sprite only asks for a new variant
+# when its bucket changes.
+# Variants are rendered from the left- or right-facing image, whichever is closer to the heading, so sprites never end
+# up upside down. The variants are kept in a SurfaceCache, bounded by a byte budget: the least-recently-used variants
+# are evicted over budget and simply re-rendered if needed again. (Sprites already showing an evicted variant keep it
+# alive on their own.)
+# Angles are in degrees, counter-clockwise on screen, 0 = right. (Screen Y points down, hence the -dy.)
+
+VariantKey = tuple[ImageKey, int, int]  # (image key, angle bucket, scale bucket)
+
+
+class VariantCache:
+    def __init__(self, angle_steps: int, scale_step: float, budget_bytes: int = 0):
+        self.angle_steps: int = angle_steps
+        self.angle_step: float = 360.0 / angle_steps  # Degrees per bucket.
+        self.scale_step: float = scale_step
+        self.cache: SurfaceCache = SurfaceCache(budget_bytes=budget_bytes)  # VariantKey -> Surface. No loader.
+        self.renders: int = 0
+
+    def angle_bucket(self, dx: float, dy: float) -> int:
+        return round(math.degrees(math.atan2(-dy, dx)) / self.angle_step) % self.angle_steps
+
+    def scale_bucket(self, scale: float) -> int:
+        return max(1, round(scale / self.scale_step))
+
+    def get(self, img_key: ImageKey, angle_bucket: int, scale_bucket: int,
+            surface_l: pygame.Surface, surface_r: pygame.Surface) -> pygame.Surface:
+        key = (img_key, angle_bucket, scale_bucket)
+        surface = self.cache.find(key)
+        if surface is None:
+            surface = self.render(angle_bucket, scale_bucket, surface_l, surface_r)
+            # Unrotated, unscaled variants are the SCACHE surfaces themselves, so they cost nothing extra here.
+            self.cache.put(key, surface, 0 if surface is surface_l or surface is surface_r else surface_bytes(surface))
+            self.renders += 1
+        return surface
+
+    def render(self, angle_bucket: int, scale_bucket: int,
+               surface_l: pygame.Surface, surface_r: pygame.Surface) -> pygame.Surface:
+        angle = angle_bucket * self.angle_step
+        if angle > 180.0:
+            angle -= 360.0  # -180 < angle <= 180
+        if -90.0 <= angle <= 90.0:
+            base, rotation = surface_r, angle  # Right-facing image, tilted up or down.
+        else:
+            base, rotation = surface_l, angle - 180.0 if angle > 0 else angle + 180.0  # Left-facing image, tilted.
+        scale = scale_bucket * self.scale_step
+        if rotation == 0.0 and scale == 1.0:
+            return base
+        return pygame.transform.rotozoom(base, rotation, scale).convert_alpha()
+
+    def stats(self) -> dict:
+        return {
+            'variants': len(self.cache),
+            'hits': self.cache.hits,
+            'renders': self.renders,
+            'evictions': self.cache.evictions,
+            'resident_bytes': self.cache.resident_bytes,
+            'budget_bytes': self.cache.budget_bytes,
+        }
+
+
+if __name__ == '__main__':
+    print("WARNING: PyGameFun variants.py has been run directly, however it is only meant to be imported.")
+    sys.exit(1)
+
+
+##
+#